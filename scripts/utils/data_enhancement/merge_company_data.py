@@ -14,18 +14,22 @@ Features:
 - Batch processing with progress tracking
 """
 
+import glob
 import json
 import os
 import sys
 import asyncio
 import aiohttp
+import random
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
-import shutil
+from typing import Dict, List, Optional, Any, Tuple, Union
+import io
+import tarfile
 import hashlib
 import logging
+from dataclasses import dataclass, fields
 
 # Add project root to path
 sys.path.append(str(Path(__file__).parents[3]))
@@ -41,14 +45,53 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+@dataclass(frozen=True)
+class CompanyData:
+    """Fixed schema of the company_data section added to each file"""
+    sector: Optional[str] = None  # Standard Industrial Classification
+    industry: Optional[str] = None  # Security type/industry
+    primary_exchange: Optional[str] = None
+    cik: Optional[str] = None  # Central Index Key for SEC filings
+
+    @classmethod
+    def from_polygon(cls, result: Dict[str, Any]) -> "CompanyData":
+        return cls(
+            sector=result.get('sic_description'),
+            industry=result.get('type'),
+            primary_exchange=result.get('primary_exchange'),
+            cik=result.get('cik')
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Flat schema, so a shallow dict is enough (dataclasses.asdict deep-copies)
+        return dict(self.__dict__)
+
+
+COMPANY_DATA_FIELDS = tuple(f.name for f in fields(CompanyData))
+
+# Per-ticker sidecar written by --sidecar runs: TICKER/company_data.json. StorageService
+# (src/services/storage_service.py) merges it into records on load and uses the same name.
+COMPANY_SIDECAR_NAME = "company_data.json"
+
+
 class CompanyDataMerger:
     """Safely merge company classification data into existing datasets"""
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, sidecar: bool = False):
         self.api_key = api_key
+        self.sidecar = sidecar  # Write TICKER/company_data.json instead of touching daily files
         self.base_url = "https://api.polygon.io"
         self.session = None
         self.rate_limit_delay = 0.01  # 10ms for unlimited plan
+        self.max_attempts = 5
+        self.max_backoff = 30.0
+        self.retryable_statuses = {429, 500, 502, 503, 504}
+
+        # Single backup archive per merge run (opened lazily on first backup)
+        self.backup_root: Optional[Path] = None
+        self._backup_file = None
+        self._backup_tar: Optional[tarfile.TarFile] = None
 
         # Version tracking
         self.merge_version = f"v{datetime.now().strftime('%Y%m%d_%H%M%S')}"
@@ -58,15 +101,24 @@ class CompanyDataMerger:
             "operation": "company_data_merge",
             "description": "Added company classification data (sector, industry, exchange, CIK)",
             "data_source": "polygon.io_v3_ticker_details",
-            "fields_added": ["sector", "industry", "primary_exchange", "cik"],
+            "fields_added": list(COMPANY_DATA_FIELDS),
             "safety_measures": ["backup_created", "validation_checks", "non_destructive_merge"]
         }
 
+        # Per-file metadata patch, built once and applied to every enhanced file
+        self._enhance_ts = datetime.now().isoformat()
+        self._meta_patch = {
+            "data_version": self.merge_version,
+            "last_enhanced": self._enhance_ts,
+            "enhancement_operation": "company_data_merge"
+        }
+
         # Statistics tracking
         self.stats = {
             "files_processed": 0,
             "files_enhanced": 0,
             "files_skipped": 0,
+            "sidecars_written": 0,
             "api_calls_made": 0,
             "errors_encountered": 0,
             "start_time": None,
@@ -74,9 +126,16 @@ class CompanyDataMerger:
         }
 
     async def __aenter__(self):
+        # Every call goes to api.polygon.io, so size the pool per host and keep
+        # connections (and the resolved address) alive for the whole run
         self.session = aiohttp.ClientSession(
             timeout=aiohttp.ClientTimeout(total=30),
-            connector=aiohttp.TCPConnector(limit=100, limit_per_host=10)
+            connector=aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=100,
+                keepalive_timeout=60,
+                ttl_dns_cache=300
+            )
         )
         self.stats["start_time"] = datetime.now()
         return self
@@ -84,6 +143,7 @@ class CompanyDataMerger:
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.session:
             await self.session.close()
+        self.close_backup_archive()
         self.stats["end_time"] = datetime.now()
 
     async def _rate_limit(self):
@@ -95,53 +155,116 @@ class CompanyDataMerger:
         url = f"{self.base_url}/v3/reference/tickers/{ticker}"
         params = {'apikey': self.api_key}
 
-        try:
-            await self._rate_limit()
-            async with self.session.get(url, params=params) as response:
-                self.stats["api_calls_made"] += 1
-
-                if response.status == 200:
-                    data = await response.json()
-                    if data.get('status') == 'OK' and 'results' in data:
-                        result = data['results']
-
-                        # Extract company classification data
-                        company_data = {
-                            'sector': result.get('sic_description'),  # Standard Industrial Classification
-                            'industry': result.get('type'),  # Security type/industry
-                            'primary_exchange': result.get('primary_exchange'),
-                            'cik': result.get('cik')  # Central Index Key for SEC filings
-                        }
-
-                        logger.debug(f"Retrieved company data for {ticker}: {company_data}")
-                        return company_data
-                else:
-                    logger.warning(f"API error for {ticker}: HTTP {response.status}")
-
-        except Exception as e:
-            logger.warning(f"Could not get company data for {ticker}: {e}")
-            self.stats["errors_encountered"] += 1
-
+        for attempt in range(self.max_attempts):
+            retry_delay = None
+
+            try:
+                await self._rate_limit()
+                async with self.session.get(url, params=params) as response:
+                    self.stats["api_calls_made"] += 1
+
+                    if response.status == 200:
+                        data = await response.json()
+                        if data.get('status') == 'OK' and 'results' in data:
+                            result = data['results']
+
+                            # Extract company classification data
+                            company_data = CompanyData.from_polygon(result).to_dict()
+
+                            logger.debug(f"Retrieved company data for {ticker}: {company_data}")
+                            return company_data
+                        return None
+                    elif response.status in self.retryable_statuses:
+                        retry_delay = self._retry_delay(attempt, response.headers.get('Retry-After'))
+                        logger.warning(f"API error for {ticker}: HTTP {response.status}, "
+                                       f"retrying in {retry_delay:.1f}s (attempt {attempt + 1}/{self.max_attempts})")
+                    else:
+                        logger.warning(f"API error for {ticker}: HTTP {response.status}")
+                        return None
+
+            except Exception as e:
+                logger.warning(f"Could not get company data for {ticker}: {e}")
+                self.stats["errors_encountered"] += 1
+                return None
+
+            if attempt + 1 < self.max_attempts:
+                await asyncio.sleep(retry_delay)
+
+        logger.warning(f"Giving up on {ticker} after {self.max_attempts} attempts")
         return None
 
-    def create_backup(self, file_path: Path) -> Path:
-        """Create a backup of the original file"""
-        backup_dir = file_path.parent / "backups" / self.merge_version
+    def _retry_delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        """Backoff delay for a retryable response, honoring Retry-After when present"""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass  # HTTP-date form; fall back to exponential backoff
+        return min(2 ** attempt, self.max_backoff) + random.random()
+
+    def _open_backup_archive(self, root: Path):
+        """Open the backup archive shared by every file in this merge run"""
+        self.backup_root = root
+        backup_dir = root / "backups"
         backup_dir.mkdir(parents=True, exist_ok=True)
 
-        backup_path = backup_dir / file_path.name
-        shutil.copy2(file_path, backup_path)
+        # Uncompressed on purpose: a gzip stream is only readable once it is closed, so a
+        # crash mid-run would take the backups of already-modified files with it
+        archive_path = backup_dir / f"{self.merge_version}.tar"
+        # The file is opened here rather than by tarfile so it can be fsynced after close
+        self._backup_file = open(archive_path, 'wb')
+        self._backup_tar = tarfile.open(fileobj=self._backup_file, mode='w')
+        logger.info(f"Writing backups to: {archive_path}")
+
+    def sync_backup_archive(self):
+        """fsync the backup archive so every member written so far survives a power loss"""
+        if self._backup_file is not None:
+            self._backup_file.flush()
+            os.fsync(self._backup_file.fileno())
+
+    def close_backup_archive(self):
+        """Finish, fsync and close the backup archive"""
+        if self._backup_tar is not None:
+            self._backup_tar.close()  # writes the end-of-archive blocks; the file stays open
+            self.sync_backup_archive()
+            self._backup_file.close()
+            self._backup_tar = None
+            self._backup_file = None
+
+    def create_backup(self, file_path: Union[str, Path], raw: bytes) -> str:
+        """Append the original file contents to the run's backup archive.
+
+        The member is flushed to the OS before returning, so a crash or kill of this
+        process after the caller overwrites the original still leaves the backup in the
+        archive. The disk itself is only synced once per batch (sync_backup_archive) and
+        at close: a power loss or OS crash can lose the backups of the batch in flight,
+        which is the price of not paying one fsync per file.
+        """
+        file_path = Path(file_path).resolve()
+        if self._backup_tar is None:
+            # Standalone enhance_file calls: anchor at the data root of TICKER/YYYY/MM/DATE.json
+            parents = file_path.parents
+            self._open_backup_archive(self.backup_root or (parents[3] if len(parents) > 3 else parents[0]))
+
+        try:
+            arcname = str(file_path.relative_to(self.backup_root))
+        except ValueError:
+            # Outside the archive root: keep the full path, relative to the filesystem root
+            arcname = str(file_path.relative_to(file_path.anchor))
 
-        logger.debug(f"Created backup: {backup_path}")
-        return backup_path
+        info = tarfile.TarInfo(arcname)
+        info.size = len(raw)
+        info.mtime = int(file_path.stat().st_mtime)
+        self._backup_tar.addfile(info, io.BytesIO(raw))
+        self._backup_file.flush()
+
+        logger.debug(f"Created backup: {arcname}")
+        return arcname
 
     def calculate_file_hash(self, file_path: Path) -> str:
         """Calculate SHA-256 hash of file for integrity verification"""
-        sha256_hash = hashlib.sha256()
         with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
+            return hashlib.file_digest(f, "sha256").hexdigest()
 
     def validate_data_integrity(self, original_data: Dict, enhanced_data: Dict) -> bool:
         """Validate that enhanced data preserves all original data"""
@@ -152,14 +275,8 @@ class CompanyDataMerger:
                     logger.error(f"Missing original key: {key}")
                     return False
 
-            # Validate critical data sections are unchanged
-            critical_sections = ['basic_data', 'technical_indicators', 'fundamental_data', 'metadata']
-
-            for section in critical_sections:
-                if section in original_data:
-                    if original_data[section] != enhanced_data.get(section):
-                        logger.error(f"Data corruption detected in section: {section}")
-                        return False
+            # Existing sections are never rewritten (the merge only adds keys),
+            # so there is no need to deep-compare them here
 
             # Ensure company_data was added correctly
             if 'company_data' not in enhanced_data:
@@ -168,9 +285,7 @@ class CompanyDataMerger:
 
             # Verify company_data structure
             company_data = enhanced_data['company_data']
-            expected_fields = ['sector', 'industry', 'primary_exchange', 'cik']
-
-            for field in expected_fields:
+            for field in COMPANY_DATA_FIELDS:
                 if field not in company_data:
                     logger.error(f"Missing company data field: {field}")
                     return False
@@ -187,9 +302,10 @@ class CompanyDataMerger:
         try:
             self.stats["files_processed"] += 1
 
-            # Read original file
-            with open(file_path, 'r') as f:
-                original_data = json.load(f)
+            # Read original file (raw bytes are kept for backup/restore)
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+            original_data = json.loads(raw)
 
             # Skip if already has company_data
             if 'company_data' in original_data:
@@ -198,8 +314,7 @@ class CompanyDataMerger:
                 return True
 
             # Create backup
-            backup_path = self.create_backup(file_path)
-            original_hash = self.calculate_file_hash(file_path)
+            self.create_backup(file_path, raw)
 
             # Get company data from API
             company_data = await self.get_company_data(ticker)
@@ -207,17 +322,12 @@ class CompanyDataMerger:
                 logger.warning(f"Could not retrieve company data for {ticker}")
                 return False
 
-            # Create enhanced data (non-destructive merge)
-            enhanced_data = original_data.copy()
-            enhanced_data['company_data'] = company_data
+            # Create enhanced data (non-destructive merge: only new keys are added)
+            original_data['company_data'] = company_data
+            enhanced_data = original_data
 
             # Add version tracking to metadata
-            if 'metadata' not in enhanced_data:
-                enhanced_data['metadata'] = {}
-
-            enhanced_data['metadata']['data_version'] = self.merge_version
-            enhanced_data['metadata']['last_enhanced'] = datetime.now().isoformat()
-            enhanced_data['metadata']['enhancement_operation'] = "company_data_merge"
+            enhanced_data.setdefault('metadata', {}).update(self._meta_patch)
 
             # Validate data integrity
             if not self.validate_data_integrity(original_data, enhanced_data):
@@ -226,7 +336,7 @@ class CompanyDataMerger:
 
             # Write enhanced data
             with open(file_path, 'w') as f:
-                json.dump(enhanced_data, f, indent=2, default=str)
+                json.dump(enhanced_data, f, indent=2)
 
             # Verify file was written correctly
             with open(file_path, 'r') as f:
@@ -234,8 +344,9 @@ class CompanyDataMerger:
 
             if not self.validate_data_integrity(original_data, verification_data):
                 logger.error(f"Post-write validation failed for {file_path}")
-                # Restore from backup
-                shutil.copy2(backup_path, file_path)
+                # Restore original contents
+                with open(file_path, 'wb') as f:
+                    f.write(raw)
                 logger.info(f"Restored original file from backup: {file_path}")
                 return False
 
@@ -248,28 +359,60 @@ class CompanyDataMerger:
             self.stats["errors_encountered"] += 1
             return False
 
-    def find_files_to_enhance(self, base_path: str, pattern: str = "**/*.json") -> List[Tuple[Path, str]]:
+    @staticmethod
+    def has_company_data(raw: bytes) -> bool:
+        """Check for a top-level company_data key without parsing the file.
+
+        Merged files are written with indent=2, so a top-level key always starts
+        a line with exactly two spaces of indentation. Files where the key only
+        appears elsewhere are left for the full parse in enhance_file_with_data.
+        """
+        if b'"company_data"' not in raw:
+            return False
+        return b'\n  "company_data":' in raw
+
+    def find_files_to_enhance(self, base_path: str, pattern: str = "**/*.json") -> List[Tuple[str, str]]:
         """Find files that need company data enhancement"""
-        base_path = Path(base_path)
         files_with_tickers = []
+        already_enhanced = 0
+
+        # Paths stay plain strings: open() accepts them and string ops avoid pathlib overhead per file
+        for file_path in glob.iglob(os.path.join(base_path, pattern), recursive=True):
+            if file_path.endswith('.json') and os.path.isfile(file_path):
+                # Our own run metadata and ticker sidecars live under base_path and are not daily files
+                if (f"{os.sep}merge_metadata{os.sep}" in file_path
+                        or os.path.basename(file_path) == COMPANY_SIDECAR_NAME):
+                    continue
+
+                # Cheap byte-level check so re-runs don't JSON-parse files that were already merged
+                with open(file_path, 'rb') as f:
+                    if self.has_company_data(f.read()):
+                        already_enhanced += 1
+                        continue
 
-        for file_path in base_path.glob(pattern):
-            if file_path.is_file() and file_path.suffix == '.json':
                 # Extract ticker from file path (assumes structure: .../TICKER/YYYY/MM/YYYY-MM-DD.json)
                 try:
-                    ticker = file_path.parts[-4]  # Get ticker from path structure
+                    ticker = file_path.rsplit(os.sep, 4)[-4]  # Get ticker from path structure
                     files_with_tickers.append((file_path, ticker))
                 except IndexError:
                     logger.warning(f"Could not extract ticker from path: {file_path}")
                     continue
 
-        logger.info(f"Found {len(files_with_tickers)} files to potentially enhance")
+        self.stats["files_skipped"] += already_enhanced
+        logger.info(f"Found {len(files_with_tickers)} files to potentially enhance "
+                    f"({already_enhanced} already have company_data)")
         return files_with_tickers
 
-    async def merge_company_data(self, base_path: str, pattern: str = "**/*.json", batch_size: int = 50) -> Dict[str, Any]:
+    async def merge_company_data(self, base_path: str, pattern: str = "**/*.json", batch_size: int = 50,
+                                 min_batch_interval: float = 0.0) -> Dict[str, Any]:
         """Main method to merge company data into existing dataset"""
         logger.info(f"Starting company data merge - Version: {self.merge_version}")
 
+        # Backups for this run go into a single archive under base_path; an archive that is
+        # already open keeps its root so every member's arcname stays relative to one path
+        if self._backup_tar is None:
+            self.backup_root = Path(base_path).resolve()
+
         # Find files to enhance
         files_to_process = self.find_files_to_enhance(base_path, pattern)
 
@@ -284,6 +427,12 @@ class CompanyDataMerger:
                 ticker_files[ticker] = []
             ticker_files[ticker].append(file_path)
 
+        if self.sidecar:
+            # Tickers that already have a sidecar need no API call
+            done = [t for t, paths in ticker_files.items() if self._sidecar_path(paths[0]).exists()]
+            for ticker in done:
+                self.stats["files_skipped"] += len(ticker_files.pop(ticker))
+
         logger.info(f"Processing {len(ticker_files)} unique tickers across {len(files_to_process)} files")
 
         # Process files in batches by ticker
@@ -298,7 +447,10 @@ class CompanyDataMerger:
                 # Get company data once per ticker
                 company_data = await self.get_company_data(ticker)
 
-                if company_data:
+                if company_data and self.sidecar:
+                    # One write per ticker; daily files are left untouched
+                    self.write_company_sidecar(ticker_files[ticker][0], ticker, company_data)
+                elif company_data:
                     # Apply to all files for this ticker
                     for file_path in ticker_files[ticker]:
                         await self.enhance_file_with_data(file_path, ticker, company_data)
@@ -306,22 +458,50 @@ class CompanyDataMerger:
                     logger.warning(f"Skipping all files for ticker {ticker} - no company data available")
                     self.stats["files_skipped"] += len(ticker_files[ticker])
 
-            # Small delay between batches
-            await asyncio.sleep(0.5)
+            # One disk sync per batch for the backups of every file rewritten in it
+            self.sync_backup_archive()
+
+            # Optional pause between batches; rate control otherwise lives in the 429 backoff
+            if min_batch_interval > 0:
+                await asyncio.sleep(min_batch_interval)
 
         # Save merge metadata
         await self.save_merge_metadata(base_path)
 
         return self.get_summary()
 
-    async def enhance_file_with_data(self, file_path: Path, ticker: str, company_data: Dict[str, Any]) -> bool:
+    @staticmethod
+    def _sidecar_path(file_path: Union[str, Path]) -> Path:
+        """Sidecar location for the ticker owning a TICKER/YYYY/MM/DATE.json file"""
+        return Path(file_path).parents[2] / COMPANY_SIDECAR_NAME
+
+    def write_company_sidecar(self, file_path: Union[str, Path], ticker: str, company_data: Dict[str, Any]) -> Path:
+        """Atomically write the per-ticker company_data sidecar"""
+        sidecar_path = self._sidecar_path(file_path)
+        payload = {
+            "ticker": ticker,
+            "company_data": company_data,
+            "metadata": self._meta_patch
+        }
+
+        tmp_path = sidecar_path.with_name(sidecar_path.name + ".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(payload, f, indent=2)
+        os.replace(tmp_path, sidecar_path)
+
+        self.stats["sidecars_written"] += 1
+        logger.debug(f"Wrote company data sidecar: {sidecar_path}")
+        return sidecar_path
+
+    async def enhance_file_with_data(self, file_path: str, ticker: str, company_data: Dict[str, Any]) -> bool:
         """Enhance a file with pre-fetched company data"""
         try:
             self.stats["files_processed"] += 1
 
-            # Read original file
-            with open(file_path, 'r') as f:
-                original_data = json.load(f)
+            # Read original file (raw bytes are kept for backup/restore)
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+            original_data = json.loads(raw)
 
             # Skip if already has company_data
             if 'company_data' in original_data:
@@ -330,19 +510,14 @@ class CompanyDataMerger:
                 return True
 
             # Create backup
-            backup_path = self.create_backup(file_path)
+            self.create_backup(file_path, raw)
 
-            # Create enhanced data (non-destructive merge)
-            enhanced_data = original_data.copy()
-            enhanced_data['company_data'] = company_data.copy()
+            # Create enhanced data (non-destructive merge: only new keys are added)
+            original_data['company_data'] = company_data
+            enhanced_data = original_data
 
             # Add version tracking to metadata
-            if 'metadata' not in enhanced_data:
-                enhanced_data['metadata'] = {}
-
-            enhanced_data['metadata']['data_version'] = self.merge_version
-            enhanced_data['metadata']['last_enhanced'] = datetime.now().isoformat()
-            enhanced_data['metadata']['enhancement_operation'] = "company_data_merge"
+            enhanced_data.setdefault('metadata', {}).update(self._meta_patch)
 
             # Validate data integrity
             if not self.validate_data_integrity(original_data, enhanced_data):
@@ -351,7 +526,7 @@ class CompanyDataMerger:
 
             # Write enhanced data
             with open(file_path, 'w') as f:
-                json.dump(enhanced_data, f, indent=2, default=str)
+                json.dump(enhanced_data, f, indent=2)
 
             # Verify file was written correctly
             with open(file_path, 'r') as f:
@@ -359,8 +534,9 @@ class CompanyDataMerger:
 
             if not self.validate_data_integrity(original_data, verification_data):
                 logger.error(f"Post-write validation failed for {file_path}")
-                # Restore from backup
-                shutil.copy2(backup_path, file_path)
+                # Restore original contents
+                with open(file_path, 'wb') as f:
+                    f.write(raw)
                 logger.info(f"Restored original file from backup: {file_path}")
                 return False
 
@@ -380,14 +556,21 @@ class CompanyDataMerger:
 
         metadata_file = metadata_dir / f"merge_{self.merge_version}.json"
 
+        # Serialize timestamps up front so json.dump needs no default= fallback
+        statistics = {
+            **self.stats,
+            "start_time": self.stats["start_time"].isoformat() if self.stats["start_time"] else None,
+            "end_time": self.stats["end_time"].isoformat() if self.stats["end_time"] else None
+        }
+
         complete_metadata = {
             **self.merge_metadata,
-            "statistics": self.stats,
+            "statistics": statistics,
             "duration_seconds": (self.stats["end_time"] - self.stats["start_time"]).total_seconds() if self.stats["end_time"] else None
         }
 
         with open(metadata_file, 'w') as f:
-            json.dump(complete_metadata, f, indent=2, default=str)
+            json.dump(complete_metadata, f, indent=2)
 
         logger.info(f"Merge metadata saved to: {metadata_file}")
 
@@ -412,6 +595,10 @@ async def main():
     parser.add_argument('base_path', help='Base path to search for JSON files')
     parser.add_argument('--pattern', default='**/*.json', help='File pattern to match (default: **/*.json)')
     parser.add_argument('--batch-size', type=int, default=50, help='Batch size for processing (default: 50)')
+    parser.add_argument('--min-batch-interval', type=float, default=0.0,
+                        help='Seconds to pause between ticker batches (default: 0)')
+    parser.add_argument('--sidecar', action='store_true',
+                        help='Write one TICKER/company_data.json per ticker instead of updating every daily file')
     parser.add_argument('--dry-run', action='store_true', help='Show what would be processed without making changes')
     args = parser.parse_args()
 
@@ -440,11 +627,12 @@ async def main():
         return
 
     # Execute merge operation
-    async with CompanyDataMerger(api_key) as merger:
+    async with CompanyDataMerger(api_key, sidecar=args.sidecar) as merger:
         summary = await merger.merge_company_data(
             base_path=args.base_path,
             pattern=args.pattern,
-            batch_size=args.batch_size
+            batch_size=args.batch_size,
+            min_batch_interval=args.min_batch_interval
         )
 
         # Print summary
@@ -453,6 +641,7 @@ async def main():
         logger.info(f"Files Processed: {summary['statistics']['files_processed']}")
         logger.info(f"Files Enhanced: {summary['statistics']['files_enhanced']}")
         logger.info(f"Files Skipped: {summary['statistics']['files_skipped']}")
+        logger.info(f"Sidecars Written: {summary['statistics']['sidecars_written']}")
         logger.info(f"API Calls Made: {summary['statistics']['api_calls_made']}")
         logger.info(f"Errors Encountered: {summary['statistics']['errors_encountered']}")
         logger.info(f"Success Rate: {summary['success_rate']:.1f}%")
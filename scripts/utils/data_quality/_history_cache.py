@@ -0,0 +1,147 @@
+"""
+Local Parquet caches for the data quality scripts.
+
+HistoryCache: each provider gets one stacked table (ticker, date, open, high, low,
+close, volume) plus a small JSON coverage index recording which date range was
+fetched per ticker, so re-runs only hit the network for the part of a ticker's
+window that was never downloaded (e.g. the one new day of a daily run) and append it.
+
+IndicatorState: running EMA/MACD/RSI state per ticker as of its last processed bar,
+so the next day's values are one recurrence step instead of a full recompute.
+"""
+
+import json
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+CACHE_DIR = Path('/workspaces/data/cache')
+HISTORY_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+STATE_COLUMNS = ['date', 'close', 'ema_12', 'ema_26', 'macd_signal', 'avg_gain', 'avg_loss', 'bars']
+
+
+def _shift(day: str, days: int) -> str:
+    """'YYYY-MM-DD' date moved by a number of days"""
+    return (date.fromisoformat(day) + timedelta(days=days)).isoformat()
+
+
+class HistoryCache:
+    def __init__(self, provider: str, cache_dir: Path = CACHE_DIR):
+        self.provider = provider
+        self.path = Path(cache_dir) / f'history_{provider}.parquet'
+        self.coverage_path = Path(cache_dir) / f'history_{provider}_coverage.json'
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._coverage: Dict[str, Tuple[str, str]] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        if not self.path.exists() or not self.coverage_path.exists():
+            return
+        try:
+            with open(self.coverage_path, 'r') as f:
+                self._coverage = {t: tuple(r) for t, r in json.load(f).items()}
+            table = pd.read_parquet(self.path)
+            for ticker, frame in table.groupby('ticker', sort=False):
+                self._frames[ticker] = frame.drop(columns='ticker').set_index('date').sort_index()
+        except Exception as e:
+            print(f"⚠️  Ignoring unreadable history cache {self.path}: {str(e)[:80]}")
+            self._frames, self._coverage = {}, {}
+
+    def missing_range(self, ticker: str, start: str, end: str) -> Optional[Tuple[str, str]]:
+        """Date range to fetch so that [start, end] is covered, or None if it already is.
+
+        Coverage is one contiguous range per ticker. A window that runs past one end of
+        it only needs the uncovered days; a window that is disjoint from it or runs past
+        both ends is fetched whole.
+        """
+        covered = self._coverage.get(ticker)
+        if covered is None:
+            return start, end
+        covered_start, covered_end = covered
+        if covered_start <= start and end <= covered_end:
+            return None
+        if covered_start <= start <= _shift(covered_end, 1):
+            return _shift(covered_end, 1), end
+        if end <= covered_end and _shift(covered_start, -1) <= end:
+            return start, _shift(covered_start, -1)
+        return start, end
+
+    def get(self, ticker: str, start: str, end: str) -> Optional[pd.DataFrame]:
+        """Cached bars for [start, end] (inclusive) if that whole range was fetched before"""
+        if self.missing_range(ticker, start, end) is not None:
+            return None
+        return self.bars(ticker, start, end)
+
+    def bars(self, ticker: str, start: str, end: str) -> pd.DataFrame:
+        """Stored bars within [start, end], whether or not the whole range was fetched"""
+        frame = self._frames.get(ticker)
+        if frame is None:
+            return pd.DataFrame(columns=HISTORY_COLUMNS)  # nothing stored (or provider had no bars)
+        return frame.loc[(frame.index >= start) & (frame.index <= end)]
+
+    def put(self, ticker: str, start: str, end: str, frame: Optional[pd.DataFrame]):
+        """Store bars fetched for [start, end]; frame must be indexed by 'YYYY-MM-DD' date strings.
+
+        A range that overlaps or touches the ticker's coverage widens it and the bars are
+        merged in (freshly fetched bars win on overlapping dates). A disjoint range
+        replaces both, so the coverage never has a gap.
+        """
+        self._dirty = True
+        covered = self._coverage.get(ticker)
+        if covered is not None and start <= _shift(covered[1], 1) and _shift(covered[0], -1) <= end:
+            self._coverage[ticker] = (min(start, covered[0]), max(end, covered[1]))
+            stored = self._frames.get(ticker)
+        else:
+            self._coverage[ticker] = (start, end)
+            stored = None
+
+        if frame is None or frame.empty:
+            if stored is None:
+                self._frames.pop(ticker, None)
+            return
+
+        fetched = frame[HISTORY_COLUMNS].astype('float64')
+        if stored is not None:
+            fetched = pd.concat([stored[~stored.index.isin(fetched.index)], fetched])
+        self._frames[ticker] = fetched.sort_index()
+
+    def save(self):
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        frames = [frame.rename_axis('date').reset_index().assign(ticker=ticker)
+                  for ticker, frame in self._frames.items()]
+        if frames:
+            table = pd.concat(frames, ignore_index=True)
+        else:
+            table = pd.DataFrame(columns=['date', *HISTORY_COLUMNS, 'ticker'])
+        table.to_parquet(self.path, index=False)
+        with open(self.coverage_path, 'w') as f:
+            json.dump(self._coverage, f)
+        self._dirty = False
+
+
+class IndicatorState:
+    def __init__(self, name: str, cache_dir: Path = CACHE_DIR):
+        self.path = Path(cache_dir) / f'indicator_state_{name}.parquet'
+        self.rows: Dict[str, Dict] = {}
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            self.rows = pd.read_parquet(self.path).set_index('ticker').to_dict('index')
+        except Exception as e:
+            print(f"⚠️  Ignoring unreadable indicator state {self.path}: {str(e)[:80]}")
+            self.rows = {}
+
+    def save(self):
+        if not self.rows:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        table = pd.DataFrame.from_dict(self.rows, orient='index', columns=STATE_COLUMNS)
+        table.rename_axis('ticker').reset_index().to_parquet(self.path, index=False)
@@ -0,0 +1,115 @@
+"""
+Shared kernels for the technical indicator calculations in the data quality scripts.
+
+Loop kernels are compiled with numba when it is installed. numba is optional: without
+it they run as plain Python/NumPy, so callers get identical results either way.
+Array inputs should go through as_f8() so every kernel only ever sees one array type
+and numba compiles (and disk-caches) a single specialization of it.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba not installed - fall back to the undecorated functions
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
+
+
+def as_f8(values) -> np.ndarray:
+    """Writable, C-contiguous float64 view (or copy) of values for the kernels.
+
+    Arrays from pandas can be read-only views; numba treats those as a separate type
+    and would compile every kernel a second time for them.
+    """
+    return np.require(values, dtype=np.float64, requirements=['C', 'W'])
+
+
+@njit(cache=True, fastmath=True)
+def _wilder_last(gains: np.ndarray, losses: np.ndarray, period: int):
+    """Wilder-smoothed average gain and loss after the last move, kept as two scalars"""
+    # Seed with the simple average of the first `period` moves
+    avg_gain = gains[:period].sum() / period
+    avg_loss = losses[:period].sum() / period
+
+    for i in range(period, len(gains)):
+        avg_gain = ((avg_gain * (period - 1)) + gains[i]) / period
+        avg_loss = ((avg_loss * (period - 1)) + losses[i]) / period
+
+    return avg_gain, avg_loss
+
+
+@njit(cache=True, fastmath=True)
+def _wilder_averages(prices: np.ndarray, period: int):
+    """Wilder-smoothed average gain and average loss as of the last price"""
+    deltas = np.diff(prices)
+    return _wilder_last(np.maximum(deltas, 0.0), np.maximum(-deltas, 0.0), period)
+
+
+@njit(cache=True, fastmath=True)
+def _rsi_from_averages(avg_gain: float, avg_loss: float) -> float:
+    if avg_loss == 0:
+        return 100.0
+
+    rs = avg_gain / avg_loss
+    return 100.0 - (100.0 / (1.0 + rs))
+
+
+@njit(cache=True, fastmath=True)
+def _macd_bundle(prices: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9):
+    """EMA-fast, EMA-slow, MACD, signal and histogram of the last price in one pass.
+
+    All EMAs are seeded with the first value and kept as scalar state, so no
+    intermediate arrays are allocated. Matches pandas ewm(span=..., adjust=False)
+    applied to the close series and then to the MACD line.
+    """
+    m_fast = 2.0 / (fast + 1)
+    m_slow = 2.0 / (slow + 1)
+    m_signal = 2.0 / (signal + 1)
+
+    ema_fast = prices[0]
+    ema_slow = prices[0]
+    signal_line = 0.0  # MACD is zero at the seed point
+
+    for i in range(1, len(prices)):
+        ema_fast = (prices[i] * m_fast) + (ema_fast * (1.0 - m_fast))
+        ema_slow = (prices[i] * m_slow) + (ema_slow * (1.0 - m_slow))
+        signal_line = ((ema_fast - ema_slow) * m_signal) + (signal_line * (1.0 - m_signal))
+
+    macd = ema_fast - ema_slow
+    return ema_fast, ema_slow, macd, signal_line, macd - signal_line
+
+
+def _ema_step(prev_ema: float, price: float, period: int) -> float:
+    """Advance an EMA by one price"""
+    multiplier = 2.0 / (period + 1)
+    return (price * multiplier) + (prev_ema * (1.0 - multiplier))
+
+
+def _wilder_step(prev_avg: float, value: float, period: int) -> float:
+    """Advance a Wilder-smoothed average by one value"""
+    return ((prev_avg * (period - 1)) + value) / period
+
+
+def _rolling_mean_std(values: np.ndarray, window: int, ddof: int = 0):
+    """Rolling mean and standard deviation over every full window.
+
+    Uses running sums (window sum = cs[i + w] - cs[i]) instead of re-summing each
+    window. Returns two arrays of length len(values) - window + 1; ddof=1 matches
+    pandas' rolling().std(), ddof=0 matches np.std.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    cs = np.concatenate(([0.0], np.cumsum(values)))
+    cs_sq = np.concatenate(([0.0], np.cumsum(values * values)))
+
+    window_sum = cs[window:] - cs[:-window]
+    window_sum_sq = cs_sq[window:] - cs_sq[:-window]
+
+    mean = window_sum / window
+    var = (window_sum_sq - window_sum * mean) / (window - ddof)
+    return mean, np.sqrt(np.maximum(var, 0.0))
@@ -5,17 +5,46 @@ Enhance September 18 data by adding technical indicators and fundamental data
 
 import json
 import os
+import orjson
 import sys
 from pathlib import Path
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
 import yfinance as yf
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, Any, List, Tuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 
 # Add src to path for imports
 sys.path.append('/workspaces/data-collection-service/src')
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from _indicators_njit import (as_f8, _macd_bundle, _wilder_averages, _rsi_from_averages,
+                              _ema_step, _wilder_step)
+from _history_cache import HistoryCache, IndicatorState
+
+FUNDAMENTAL_FIELDS = (
+    'market_cap', 'pe_ratio', 'forward_pe', 'peg_ratio', 'price_to_book', 'profit_margins',
+    'return_on_equity', 'revenue', 'debt_to_equity', 'current_ratio', 'dividend_yield',
+    'sector', 'industry', 'beta', 'trailing_eps', 'book_value'
+)
+
+# Per-process enhancer used by indicator workers. Set once by the pool initializer so the
+# price history cache is handed over at startup instead of being pickled with every task.
+_worker_enhancer: Optional['DataEnhancer'] = None
+
+
+def _init_indicator_worker(target_date: str, hist_cache: Dict[str, pd.DataFrame],
+                           indicator_state: Dict[str, Dict]):
+    global _worker_enhancer
+    _worker_enhancer = DataEnhancer(target_date=target_date)
+    _worker_enhancer.hist_cache = hist_cache
+    _worker_enhancer.indicator_state = indicator_state
+
+
+def _compute_indicators(ticker: str, current_data: Dict) -> Tuple[Dict, Optional[Dict]]:
+    return _worker_enhancer.indicators_with_state(ticker, current_data)
+
 
 class DataEnhancer:
     def __init__(self, target_date='2025-09-18'):
@@ -23,6 +52,12 @@ class DataEnhancer:
         self.base_path = Path('/workspaces/data/historical/daily')
         self.fundamentals_file = '/workspaces/data/input_source/enriched_yfinance_20250919_093058.json'
         self.fundamentals_data = {}
+        self.hist_cache: Dict[str, pd.DataFrame] = {}
+        self.indicator_state: Dict[str, Dict] = {}
+        self.download_batch_size = 200
+        self.io_workers = 8
+        self.cpu_workers = os.cpu_count() or 1
+        self._indicator_pool: Optional[ProcessPoolExecutor] = None
         self.stats = {
             'total_files': 0,
             'enhanced': 0,
@@ -34,53 +69,130 @@ class DataEnhancer:
     def load_fundamentals(self):
         """Load fundamental data from enriched source"""
         print("📚 Loading fundamental data from enriched source...")
+        # stdlib json on purpose: collect_us_market_stocks.py writes this file with json.dump,
+        # so it can hold NaN/Infinity from raw yfinance info, which orjson rejects
         with open(self.fundamentals_file, 'r') as f:
             data = json.load(f)
 
-        # Convert list to dict keyed by ticker
+        # Convert list to dict keyed by ticker, keeping only the populated fields so each
+        # record can be attached to its file as-is
         for item in data:
             ticker = item.get('ticker')
             if ticker:
-                self.fundamentals_data[ticker] = {
-                    'market_cap': item.get('market_cap'),
-                    'pe_ratio': item.get('pe_ratio'),
-                    'forward_pe': item.get('forward_pe'),
-                    'peg_ratio': item.get('peg_ratio'),
-                    'price_to_book': item.get('price_to_book'),
-                    'profit_margins': item.get('profit_margins'),
-                    'return_on_equity': item.get('return_on_equity'),
-                    'revenue': item.get('revenue'),
-                    'debt_to_equity': item.get('debt_to_equity'),
-                    'current_ratio': item.get('current_ratio'),
-                    'dividend_yield': item.get('dividend_yield'),
-                    'sector': item.get('sector'),
-                    'industry': item.get('industry'),
-                    'beta': item.get('beta'),
-                    'trailing_eps': item.get('trailing_eps'),
-                    'book_value': item.get('book_value')
-                }
+                fundamentals = {k: item[k] for k in FUNDAMENTAL_FIELDS if item.get(k) is not None}
+                if fundamentals:
+                    self.fundamentals_data[ticker] = fundamentals
 
         print(f"✅ Loaded fundamentals for {len(self.fundamentals_data)} tickers")
 
-    def calculate_technical_indicators(self, ticker: str, current_data: Dict) -> Dict:
-        """Calculate technical indicators for a ticker"""
-        try:
-            # Fetch historical data (need 50+ days for indicators)
-            end_date = datetime.strptime(self.target_date, '%Y-%m-%d') + timedelta(days=1)
-            start_date = end_date - timedelta(days=70)
-
-            stock = yf.Ticker(ticker)
-            hist = stock.history(start=start_date.strftime('%Y-%m-%d'),
-                               end=end_date.strftime('%Y-%m-%d'))
+    def prefetch_history(self, tickers: List[str]):
+        """Load price history for all tickers up front from the local cache or batched downloads"""
+        # Need 50+ days for indicators
+        end_date = datetime.strptime(self.target_date, '%Y-%m-%d') + timedelta(days=1)
+        start_date = end_date - timedelta(days=70)
+        start_str = start_date.strftime('%Y-%m-%d')
+
+        # Only the part of each ticker's window the cache lacks is downloaded; tickers that
+        # miss the same range (e.g. just the new day) share batched requests
+        history = HistoryCache('yfinance')
+        missing: Dict[Tuple[str, str], List[str]] = {}
+        for ticker in tickers:
+            fetch_range = history.missing_range(ticker, start_str, self.target_date)
+            if fetch_range is not None:
+                missing.setdefault(fetch_range, []).append(ticker)
+        n_missing = sum(len(group) for group in missing.values())
+        print(f"💾 {len(tickers) - n_missing} tickers served from history cache")
+
+        print(f"📡 Prefetching price history for {n_missing} tickers...")
+        for (fetch_start, fetch_end), group in missing.items():
+            # yfinance's end date is exclusive
+            fetch_end_exclusive = (datetime.strptime(fetch_end, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+            for i in range(0, len(group), self.download_batch_size):
+                batch = group[i:i + self.download_batch_size]
+                try:
+                    data = yf.download(batch, start=fetch_start, end=fetch_end_exclusive, group_by='ticker',
+                                       auto_adjust=True, threads=True, progress=False)
+                except Exception as e:
+                    print(f"❌ Error downloading history batch {i // self.download_batch_size + 1}: {str(e)[:50]}")
+                    continue
+
+                if data.empty:
+                    continue
+
+                for ticker in batch:
+                    try:
+                        hist = data[ticker] if isinstance(data.columns, pd.MultiIndex) else data
+                    except KeyError:
+                        continue
+                    hist = hist.dropna(subset=['Close']).rename(columns=str.lower)
+                    hist.index = hist.index.strftime('%Y-%m-%d')
+                    # An all-NaN/empty frame from a batched download is usually a transient
+                    # per-symbol failure, so it is not cached as "no bars" and is retried next run
+                    if not hist.empty:
+                        history.put(ticker, fetch_start, fetch_end, hist)
+
+        # Stored bars are used even when the new range came back empty (weekend, holiday)
+        for ticker in tickers:
+            hist = history.bars(ticker, start_str, self.target_date)
+            if not hist.empty:
+                self.hist_cache[ticker] = hist
+
+        history.save()
+        print(f"✅ Price history available for {len(self.hist_cache)} tickers")
+
+    def advance_state(self, prior: Optional[Dict], close_prices: np.ndarray, dates) -> Dict:
+        """Running EMA/MACD/RSI state as of the last bar.
+
+        When the stored state ends exactly one bar earlier (and that bar's close is
+        unchanged) only the new close is applied; otherwise the state is rebuilt from
+        the full history.
+        """
+        last_date = dates[-1]
+        price = float(close_prices[-1])
+
+        if prior is not None and prior['date'] == last_date and prior['close'] == price:
+            return prior  # already up to date (re-run for the same day)
+
+        if (prior is not None and len(close_prices) >= 2 and prior['date'] == dates[-2]
+                and prior['close'] == float(close_prices[-2])):
+            delta = price - prior['close']
+            ema_12 = _ema_step(prior['ema_12'], price, 12)
+            ema_26 = _ema_step(prior['ema_26'], price, 26)
+            return {
+                'date': last_date,
+                'close': price,
+                'ema_12': ema_12,
+                'ema_26': ema_26,
+                'macd_signal': _ema_step(prior['macd_signal'], ema_12 - ema_26, 9),
+                'avg_gain': _wilder_step(prior['avg_gain'], max(delta, 0.0), 14),
+                'avg_loss': _wilder_step(prior['avg_loss'], max(-delta, 0.0), 14),
+                'bars': prior['bars'] + 1
+            }
+
+        # Cold start: full pass over the history
+        closes = as_f8(close_prices)
+        ema_12, ema_26, _, macd_signal, _ = _macd_bundle(closes, 12, 26, 9)
+        avg_gain, avg_loss = _wilder_averages(closes, 14) if len(closes) >= 15 else (np.nan, np.nan)
+        return {
+            'date': last_date,
+            'close': price,
+            'ema_12': float(ema_12),
+            'ema_26': float(ema_26),
+            'macd_signal': float(macd_signal),
+            'avg_gain': float(avg_gain),
+            'avg_loss': float(avg_loss),
+            'bars': len(closes)
+        }
 
-            if hist.empty or len(hist) < 20:
+    def calculate_technical_indicators(self, close_prices: np.ndarray, volumes: np.ndarray,
+                                       current_data: Dict, state: Optional[Dict] = None) -> Dict:
+        """Calculate technical indicators from prefetched close/volume arrays"""
+        try:
+            if len(close_prices) < 20:
                 return {}
 
-            # Ensure we have the current day's data
-            close_prices = hist['Close'].values
-            high_prices = hist['High'].values
-            low_prices = hist['Low'].values
-            volumes = hist['Volume'].values
+            if state is None:
+                state = self.advance_state(None, close_prices, range(len(close_prices)))
 
             # Calculate indicators
             indicators = {}
@@ -91,29 +203,25 @@ class DataEnhancer:
             if len(close_prices) >= 50:
                 indicators['sma_50'] = float(np.mean(close_prices[-50:]))
 
-            # Exponential Moving Averages
-            if len(close_prices) >= 12:
-                ema_12 = self._calculate_ema(close_prices, 12)
-                indicators['ema_12'] = float(ema_12[-1])
-            if len(close_prices) >= 26:
-                ema_26 = self._calculate_ema(close_prices, 26)
-                indicators['ema_26'] = float(ema_26[-1])
+            # Exponential Moving Averages and MACD from the running state
+            if state['bars'] >= 12:
+                indicators['ema_12'] = float(state['ema_12'])
+            if state['bars'] >= 26:
+                indicators['ema_26'] = float(state['ema_26'])
 
                 # MACD
-                if len(close_prices) >= 26:
-                    macd_line = ema_12[-26:] - ema_26
-                    signal_line = self._calculate_ema(macd_line, 9)
-                    indicators['macd'] = float(macd_line[-1])
-                    indicators['macd_signal'] = float(signal_line[-1])
-                    indicators['macd_histogram'] = float(macd_line[-1] - signal_line[-1])
+                macd = state['ema_12'] - state['ema_26']
+                indicators['macd'] = float(macd)
+                indicators['macd_signal'] = float(state['macd_signal'])
+                indicators['macd_histogram'] = float(macd - state['macd_signal'])
 
             # RSI (14-day)
-            if len(close_prices) >= 15:
-                indicators['rsi'] = float(self._calculate_rsi(close_prices, 14))
+            if state['bars'] >= 15:
+                indicators['rsi'] = float(_rsi_from_averages(state['avg_gain'], state['avg_loss']))
 
             # Bollinger Bands
             if len(close_prices) >= 20:
-                sma_20 = np.mean(close_prices[-20:])
+                sma_20 = indicators['sma_20']
                 std_20 = np.std(close_prices[-20:])
                 indicators['bb_upper'] = float(sma_20 + (2 * std_20))
                 indicators['bb_middle'] = float(sma_20)
@@ -139,78 +247,51 @@ class DataEnhancer:
             return indicators
 
         except Exception as e:
-            print(f"❌ Error calculating indicators for {ticker}: {str(e)[:50]}")
+            print(f"❌ Error calculating indicators: {str(e)[:50]}")
             return {}
 
-    def _calculate_ema(self, prices, period):
-        """Calculate Exponential Moving Average"""
-        ema = np.zeros_like(prices)
-        ema[0] = prices[0]
-        multiplier = 2 / (period + 1)
-
-        for i in range(1, len(prices)):
-            ema[i] = (prices[i] * multiplier) + (ema[i-1] * (1 - multiplier))
-
-        return ema
-
-    def _calculate_rsi(self, prices, period=14):
-        """Calculate Relative Strength Index"""
-        deltas = np.diff(prices)
-        gains = deltas.copy()
-        losses = deltas.copy()
-        gains[gains < 0] = 0
-        losses[losses > 0] = 0
-        losses = abs(losses)
-
-        avg_gain = np.mean(gains[:period])
-        avg_loss = np.mean(losses[:period])
-
-        for i in range(period, len(gains)):
-            avg_gain = ((avg_gain * (period - 1)) + gains[i]) / period
-            avg_loss = ((avg_loss * (period - 1)) + losses[i]) / period
-
-        if avg_loss == 0:
-            return 100
-
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-
-        return rsi
-
-    def enhance_single_file(self, file_path: Path, ticker: str) -> bool:
-        """Enhance a single data file"""
+    def _load_record(self, file_path: str, ticker: str):
+        """Phase 1: read and decode one data file"""
+        try:
+            with open(file_path, 'rb') as f:
+                return orjson.loads(f.read())
+        except Exception as e:
+            print(f"❌ Error loading {ticker}: {str(e)[:50]}")
+            self.stats['errors'] += 1
+            return None
+
+    def indicators_with_state(self, ticker: str, current_data: Dict) -> Tuple[Dict, Optional[Dict]]:
+        """Technical indicators for a ticker plus its advanced running state"""
+        hist = self.hist_cache.get(ticker)
+        if hist is None or len(hist) < 20:
+            return {}, None
+        close_prices = hist['close'].to_numpy()
+        state = self.advance_state(self.indicator_state.get(ticker), close_prices, hist.index)
+        indicators = self.calculate_technical_indicators(
+            close_prices, hist['volume'].to_numpy(), current_data, state)
+        return indicators, state
+
+    def _enhance_record(self, ticker: str, data: Dict, indicators: Dict) -> bool:
+        """Phase 2: add indicators/fundamentals in memory; True if the record changed"""
         try:
-            # Load existing data
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-
             original_keys = set(data.keys())
 
             # Add technical indicators
-            indicators = self.calculate_technical_indicators(ticker, data)
             if indicators:
                 data['technical_indicators'] = indicators
                 self.stats['technical_added'] += 1
 
             # Add fundamental data
-            if ticker in self.fundamentals_data:
-                # Filter out None values
-                fundamentals = {k: v for k, v in self.fundamentals_data[ticker].items() if v is not None}
-                if fundamentals:
-                    data['fundamentals'] = fundamentals
-                    self.stats['fundamentals_added'] += 1
+            fundamentals = self.fundamentals_data.get(ticker)
+            if fundamentals:
+                data['fundamentals'] = fundamentals
+                self.stats['fundamentals_added'] += 1
 
             # Only update if we added new data
             if set(data.keys()) != original_keys:
                 # Add metadata
                 data['enhanced_timestamp'] = datetime.now().isoformat()
                 data['data_version'] = '2.0'
-
-                # Save enhanced data
-                with open(file_path, 'w') as f:
-                    json.dump(data, f, indent=2)
-
-                self.stats['enhanced'] += 1
                 return True
 
             return False
@@ -220,13 +301,49 @@ class DataEnhancer:
             self.stats['errors'] += 1
             return False
 
-    def process_batch(self, batch: List[Tuple[Path, str]]) -> int:
-        """Process a batch of files"""
-        enhanced_count = 0
-        for file_path, ticker in batch:
-            if self.enhance_single_file(file_path, ticker):
-                enhanced_count += 1
-        return enhanced_count
+    def _save_record(self, file_path: str, ticker: str, data: Dict) -> bool:
+        """Phase 3: write an enhanced record back to disk"""
+        try:
+            with open(file_path, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+            self.stats['enhanced'] += 1
+            return True
+        except Exception as e:
+            print(f"❌ Error saving {ticker}: {str(e)[:50]}")
+            self.stats['errors'] += 1
+            return False
+
+    def process_batch(self, batch: List[Tuple[str, str]]) -> int:
+        """Process a batch of files: parallel reads, in-memory enhancement, parallel writes"""
+        with ThreadPoolExecutor(max_workers=self.io_workers) as executor:
+            records = list(executor.map(lambda item: self._load_record(*item), batch))
+
+        loaded = [(file_path, ticker, data)
+                  for (file_path, ticker), data in zip(batch, records) if data is not None]
+
+        # Indicator math is CPU-bound, so it runs in worker processes when a pool is up;
+        # only the two fields it reads from each record cross the process boundary
+        tickers = [ticker for _, ticker, _ in loaded]
+        current = [{'close': data.get('close', 0), 'volume': data.get('volume', 0)} for _, _, data in loaded]
+        if self._indicator_pool is not None:
+            results = list(self._indicator_pool.map(_compute_indicators, tickers, current, chunksize=16))
+        else:
+            results = list(map(self.indicators_with_state, tickers, current))
+
+        indicators = []
+        for ticker, (ind, state) in zip(tickers, results):
+            if state is not None:
+                self.indicator_state[ticker] = state
+            indicators.append(ind)
+
+        to_save = [(file_path, ticker, data)
+                   for (file_path, ticker, data), ind in zip(loaded, indicators)
+                   if self._enhance_record(ticker, data, ind)]
+
+        with ThreadPoolExecutor(max_workers=self.io_workers) as executor:
+            saved = list(executor.map(lambda item: self._save_record(*item), to_save))
+
+        return sum(saved)
 
     def run(self):
         """Run the enhancement process"""
@@ -244,41 +361,56 @@ class DataEnhancer:
         print(f"\n🔍 Scanning for {self.target_date} files...")
         files_to_process = []
 
-        for ticker_dir in self.base_path.iterdir():
-            if ticker_dir.is_dir():
-                ticker = ticker_dir.name
-                file_path = ticker_dir / '2025' / '09' / f'{self.target_date}.json'
-                if file_path.exists():
-                    files_to_process.append((file_path, ticker))
+        # scandir reuses the directory entry types, so only the file check costs a stat
+        with os.scandir(self.base_path) as entries:
+            for entry in entries:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                file_path = f"{entry.path}/2025/09/{self.target_date}.json"
+                if os.path.exists(file_path):
+                    files_to_process.append((file_path, entry.name))
 
         self.stats['total_files'] = len(files_to_process)
         print(f"✅ Found {len(files_to_process)} files to enhance")
 
+        # Fetch all price history before touching files
+        self.prefetch_history([ticker for _, ticker in files_to_process])
+
+        # Running indicator state from the previous run, advanced by one bar where possible
+        state_store = IndicatorState('yfinance')
+        self.indicator_state = state_store.rows
+
         # Process files in batches
         print(f"\n🚀 Starting enhancement process...")
         batch_size = 50
         start_time = datetime.now()
 
-        for i in range(0, len(files_to_process), batch_size):
-            batch = files_to_process[i:i+batch_size]
-            batch_num = (i // batch_size) + 1
-            total_batches = (len(files_to_process) + batch_size - 1) // batch_size
-
-            print(f"\n📦 Processing batch {batch_num}/{total_batches} ({i+1}-{min(i+batch_size, len(files_to_process))})...")
-
-            # Process batch with progress tracking
-            with ThreadPoolExecutor(max_workers=5) as executor:
-                futures = {executor.submit(self.enhance_single_file, fp, t): (fp, t)
-                          for fp, t in batch}
-
-                for future in as_completed(futures):
-                    future.result()  # Get result to trigger any exceptions
-
-            # Progress update
-            elapsed = (datetime.now() - start_time).total_seconds()
-            progress_pct = ((i + len(batch)) / len(files_to_process)) * 100
-            print(f"   ✅ Progress: {progress_pct:.1f}% | Enhanced: {self.stats['enhanced']} | "
-                  f"Technical: {self.stats['technical_added']} | Fundamentals: {self.stats['fundamentals_added']}")
+        self._indicator_pool = ProcessPoolExecutor(
+            max_workers=self.cpu_workers,
+            initializer=_init_indicator_worker,
+            initargs=(self.target_date, self.hist_cache, self.indicator_state)
+        )
+        try:
+            for i in range(0, len(files_to_process), batch_size):
+                batch = files_to_process[i:i+batch_size]
+                batch_num = (i // batch_size) + 1
+                total_batches = (len(files_to_process) + batch_size - 1) // batch_size
+
+                print(f"\n📦 Processing batch {batch_num}/{total_batches} ({i+1}-{min(i+batch_size, len(files_to_process))})...")
+
+                self.process_batch(batch)
+
+                # Progress update
+                elapsed = (datetime.now() - start_time).total_seconds()
+                progress_pct = ((i + len(batch)) / len(files_to_process)) * 100
+                print(f"   ✅ Progress: {progress_pct:.1f}% | Enhanced: {self.stats['enhanced']} | "
+                      f"Technical: {self.stats['technical_added']} | Fundamentals: {self.stats['fundamentals_added']}")
+        finally:
+            # Also on errors, so worker processes are never left behind
+            self._indicator_pool.shutdown()
+            self._indicator_pool = None
+
+        state_store.save()
 
         # Final summary
         print("\n" + "="*80)
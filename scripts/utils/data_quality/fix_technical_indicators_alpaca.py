@@ -5,19 +5,33 @@ Fix technical indicators for Sept 18 data using Alpaca API (simplified version)
 
 import json
 import os
+import orjson
+import sys
 from pathlib import Path
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
 from typing import Dict, Optional
 import time
 import alpaca_trade_api as tradeapi
-from alpaca_trade_api.rest import TimeFrame
+from alpaca_trade_api.rest import TimeFrame, APIError
 from dotenv import load_dotenv
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
+
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from _indicators_njit import as_f8, _rolling_mean_std, _macd_bundle
+from _history_cache import HistoryCache
 
 # Load environment variables
 load_dotenv()
 
+
+def _is_rate_limited(exc: BaseException) -> bool:
+    return isinstance(exc, APIError) and exc.status_code == 429
+
+
 class TechnicalIndicatorFixer:
     def __init__(self, target_date=None):
         self.target_date = target_date
@@ -30,6 +44,10 @@ class TechnicalIndicatorFixer:
             base_url='https://paper-api.alpaca.markets'  # Use paper trading endpoint
         )
 
+        # Local bar cache so re-runs don't re-download the same windows
+        self.history = HistoryCache('alpaca')
+        self.symbols_per_request = 100
+
         self.stats = {
             'total_files': 0,
             'technical_added': 0,
@@ -50,29 +68,29 @@ class TechnicalIndicatorFixer:
             if 'close' not in df.columns:
                 return {}
 
-            # Simple Moving Averages
+            # Pull the close column out once and share it across the rolling indicators
+            close_arr = as_f8(df['close'].to_numpy())
+
+            # Simple Moving Averages (20-day mean/std computed once, reused by Bollinger Bands)
             if len(df) >= 20:
-                indicators['sma_20'] = float(df['close'].rolling(window=20).mean().iloc[-1])
+                sma_20, std_20 = _rolling_mean_std(close_arr, 20, ddof=1)
+                indicators['sma_20'] = float(sma_20[-1])
 
             if len(df) >= 50:
-                indicators['sma_50'] = float(df['close'].rolling(window=50).mean().iloc[-1])
+                indicators['sma_50'] = float(_rolling_mean_std(close_arr, 50)[0][-1])
 
-            # Exponential Moving Averages
+            # Exponential Moving Averages and MACD in one pass (same values as ewm(adjust=False))
+            ema_12, ema_26, macd, macd_signal, macd_histogram = _macd_bundle(close_arr, 12, 26, 9)
             if len(df) >= 12:
-                ema_12 = df['close'].ewm(span=12, adjust=False).mean()
-                indicators['ema_12'] = float(ema_12.iloc[-1])
+                indicators['ema_12'] = float(ema_12)
 
             if len(df) >= 26:
-                ema_26 = df['close'].ewm(span=26, adjust=False).mean()
-                indicators['ema_26'] = float(ema_26.iloc[-1])
+                indicators['ema_26'] = float(ema_26)
 
                 # MACD
-                if len(ema_12) >= 26:
-                    macd_line = ema_12 - ema_26
-                    signal_line = macd_line.ewm(span=9, adjust=False).mean()
-                    indicators['macd'] = float(macd_line.iloc[-1])
-                    indicators['macd_signal'] = float(signal_line.iloc[-1])
-                    indicators['macd_histogram'] = float(macd_line.iloc[-1] - signal_line.iloc[-1])
+                indicators['macd'] = float(macd)
+                indicators['macd_signal'] = float(macd_signal)
+                indicators['macd_histogram'] = float(macd_histogram)
 
             # RSI (14-day)
             if len(df) >= 15:
@@ -87,31 +105,29 @@ class TechnicalIndicatorFixer:
 
             # Bollinger Bands
             if len(df) >= 20:
-                sma_20 = df['close'].rolling(window=20).mean()
-                std_20 = df['close'].rolling(window=20).std()
-                indicators['bb_upper'] = float(sma_20.iloc[-1] + (2 * std_20.iloc[-1]))
-                indicators['bb_middle'] = float(sma_20.iloc[-1])
-                indicators['bb_lower'] = float(sma_20.iloc[-1] - (2 * std_20.iloc[-1]))
+                indicators['bb_upper'] = float(sma_20[-1] + (2 * std_20[-1]))
+                indicators['bb_middle'] = float(sma_20[-1])
+                indicators['bb_lower'] = float(sma_20[-1] - (2 * std_20[-1]))
 
             # Volume indicators
             if 'volume' in df.columns and len(df) >= 20:
-                indicators['volume_sma_20'] = float(df['volume'].rolling(window=20).mean().iloc[-1])
+                indicators['volume_sma_20'] = float(_rolling_mean_std(df['volume'].to_numpy(dtype=np.float64), 20)[0][-1])
                 current_volume = float(df['volume'].iloc[-1])
                 if indicators['volume_sma_20'] > 0:
                     indicators['volume_ratio'] = current_volume / indicators['volume_sma_20']
 
             # ATR (Average True Range)
             if len(df) >= 15 and all(col in df.columns for col in ['high', 'low', 'close']):
-                high_low = df['high'] - df['low']
-                high_close = np.abs(df['high'] - df['close'].shift())
-                low_close = np.abs(df['low'] - df['close'].shift())
-
-                ranges = pd.concat([high_low, high_close, low_close], axis=1)
-                true_range = ranges.max(axis=1)
-                atr = true_range.rolling(window=14).mean()
+                high_arr = df['high'].to_numpy(dtype=np.float64)
+                low_arr = df['low'].to_numpy(dtype=np.float64)
+                prev_close = np.empty_like(close_arr)
+                prev_close[0] = np.nan
+                prev_close[1:] = close_arr[:-1]
 
-                if not atr.empty:
-                    indicators['atr'] = float(atr.iloc[-1])
+                true_range = np.maximum.reduce([high_arr - low_arr,
+                                                np.abs(high_arr - prev_close),
+                                                np.abs(low_arr - prev_close)])
+                indicators['atr'] = float(true_range[-14:].mean())
 
             return indicators
 
@@ -119,55 +135,107 @@ class TechnicalIndicatorFixer:
             print(f"❌ Error in indicator calculation: {str(e)[:100]}")
             return {}
 
+    def _history_window(self):
+        """Date range (70 days for indicators) requested for every ticker"""
+        end_date = datetime.strptime(self.target_date, '%Y-%m-%d')
+        start_date = end_date - timedelta(days=70)
+        return start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')
+
+    @retry(retry=retry_if_exception(_is_rate_limited), wait=wait_exponential(min=1, max=60),
+           stop=stop_after_attempt(6), reraise=True)
+    def _fetch_bars(self, symbols, start_str: str, end_str: str) -> pd.DataFrame:
+        """Daily bars for one symbol or a list of symbols; rate-limit errors back off and retry"""
+        self.stats['api_calls'] += 1
+        return self.api.get_bars(
+            symbols,
+            TimeFrame.Day,
+            start=start_str,
+            end=end_str,
+            adjustment='raw'
+        ).df
+
+    def prefetch_history(self, tickers):
+        """Fetch the uncached part of every ticker's window with multi-symbol Alpaca requests"""
+        start_str, end_str = self._history_window()
+
+        # Tickers missing the same range (usually just the days since the last run) share requests
+        missing = {}
+        for ticker in tickers:
+            fetch_range = self.history.missing_range(ticker, start_str, end_str)
+            if fetch_range is not None:
+                missing.setdefault(fetch_range, []).append(ticker)
+        n_missing = sum(len(group) for group in missing.values())
+        print(f"💾 {len(tickers) - n_missing} tickers served from history cache")
+        print(f"📡 Prefetching Alpaca bars for {n_missing} tickers...")
+
+        for (fetch_start, fetch_end), group in missing.items():
+            for i in range(0, len(group), self.symbols_per_request):
+                chunk = group[i:i + self.symbols_per_request]
+                try:
+                    bars = self._fetch_bars(chunk, fetch_start, fetch_end)
+                except Exception as e:
+                    # Tickers in this chunk fall back to single-symbol requests
+                    print(f"❌ Alpaca error for batch {i // self.symbols_per_request + 1}: {str(e)[:100]}")
+                    continue
+
+                by_symbol = dict(tuple(bars.groupby('symbol'))) if not bars.empty else {}
+                for ticker in chunk:
+                    frame = by_symbol.get(ticker)
+                    if frame is None:
+                        # Absent from a multi-symbol response (transient gap or cut off by
+                        # pagination): leave it uncached so the single-symbol request runs
+                        continue
+                    frame = frame.drop(columns='symbol')
+                    frame.index = frame.index.strftime('%Y-%m-%d')
+                    self.history.put(ticker, fetch_start, fetch_end, frame)
+
+        self.history.save()
+
     def get_historical_data_alpaca(self, ticker: str) -> Optional[pd.DataFrame]:
         """Get historical data from Alpaca API"""
         try:
-            # Calculate date range (70 days for indicators)
-            end_date = datetime.strptime(self.target_date, '%Y-%m-%d')
-            start_date = end_date - timedelta(days=70)
-
-            # Get bars from Alpaca
-            self.stats['api_calls'] += 1
-
-            bars = self.api.get_bars(
-                ticker,
-                TimeFrame.Day,
-                start=start_date.strftime('%Y-%m-%d'),
-                end=end_date.strftime('%Y-%m-%d'),
-                adjustment='raw'
-            ).df
-
-            if bars.empty:
-                return None
-
-            # Reset index to have clean dataframe
-            bars = bars.reset_index()
+            start_str, end_str = self._history_window()
+
+            # Get the bars the cache lacks from Alpaca and append them
+            fetch_range = self.history.missing_range(ticker, start_str, end_str)
+            if fetch_range is not None:
+                bars = self._fetch_bars(ticker, *fetch_range)
+                if bars.empty:
+                    self.history.put(ticker, *fetch_range, None)
+                else:
+                    # Index bars by trading date for the cache
+                    bars.index = bars.index.strftime('%Y-%m-%d')
+                    self.history.put(ticker, *fetch_range, bars)
 
-            return bars
+            cached = self.history.get(ticker, start_str, end_str)
+            return None if cached.empty else cached
 
-        except Exception as e:
-            if 'rate limit' in str(e).lower():
-                print(f"⏳ Rate limit hit for {ticker}, waiting 60 seconds...")
-                time.sleep(60)
-                return self.get_historical_data_alpaca(ticker)  # Retry
-            elif 'not found' in str(e).lower() or '404' in str(e):
+        except APIError as e:
+            if e.status_code == 404:
                 # Ticker not available in Alpaca
                 return None
-            else:
-                print(f"❌ Alpaca error for {ticker}: {str(e)[:100]}")
-                return None
+            print(f"❌ Alpaca error for {ticker} (HTTP {e.status_code}): {str(e)[:100]}")
+            return None
+        except Exception as e:
+            print(f"❌ Alpaca error for {ticker}: {str(e)[:100]}")
+            return None
 
-    def fix_single_file(self, file_path: Path, ticker: str) -> bool:
+    @staticmethod
+    def has_technical_indicators(file_path: str) -> bool:
+        """True if the file already carries a full technical_indicators block"""
+        try:
+            with open(file_path, 'rb') as f:
+                data = orjson.loads(f.read())
+        except Exception:
+            return False  # let fix_single_file report unreadable files
+        return len(data.get('technical_indicators') or {}) > 5
+
+    def fix_single_file(self, file_path: str, ticker: str) -> bool:
         """Fix technical indicators for a single file"""
         try:
             # Load existing data
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-
-            # Check if already has technical indicators
-            if 'technical_indicators' in data and len(data.get('technical_indicators', {})) > 5:
-                self.stats['already_has_technical'] += 1
-                return False
+            with open(file_path, 'rb') as f:
+                data = orjson.loads(f.read())
 
             # Get historical data from Alpaca
             hist_df = self.get_historical_data_alpaca(ticker)
@@ -185,8 +253,8 @@ class TechnicalIndicatorFixer:
                 data['technical_source'] = 'alpaca'
 
                 # Save the updated file
-                with open(file_path, 'w') as f:
-                    json.dump(data, f, indent=2)
+                with open(file_path, 'wb') as f:
+                    f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
 
                 self.stats['technical_added'] += 1
                 return True
@@ -226,15 +294,25 @@ class TechnicalIndicatorFixer:
         print(f"\n🔍 Scanning for {self.target_date} files...")
         files_to_process = []
 
-        for ticker_dir in self.base_path.iterdir():
-            if ticker_dir.is_dir():
-                ticker = ticker_dir.name
-                file_path = ticker_dir / '2025' / '09' / f'{self.target_date}.json'
-                if file_path.exists():
-                    files_to_process.append((file_path, ticker))
+        # scandir reuses the directory entry types, so only the file check costs a stat
+        with os.scandir(self.base_path) as entries:
+            for entry in entries:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                file_path = f"{entry.path}/2025/09/{self.target_date}.json"
+                if os.path.exists(file_path):
+                    files_to_process.append((file_path, entry.name))
 
         self.stats['total_files'] = len(files_to_process)
-        print(f"✅ Found {len(files_to_process)} files to process")
+        print(f"✅ Found {len(files_to_process)} files")
+
+        # Drop files that already have indicators before any bars are requested
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            done = list(executor.map(self.has_technical_indicators, [f for f, _ in files_to_process]))
+        files_to_process = [item for item, has in zip(files_to_process, done) if not has]
+        self.stats['already_has_technical'] = sum(done)
+        print(f"⏭️  {self.stats['already_has_technical']} already have indicators, "
+              f"{len(files_to_process)} files to process")
 
         # Process files
         print(f"\n🚀 Starting technical indicator calculation...")
@@ -251,6 +329,9 @@ class TechnicalIndicatorFixer:
         # Reorder: priority first
         files_to_process = priority_files + other_files
 
+        # Fetch bars for the whole universe up front, 100 symbols per request
+        self.prefetch_history([ticker for _, ticker in files_to_process])
+
         for i in range(0, len(files_to_process), batch_size):
             batch = files_to_process[i:i+batch_size]
             batch_num = (i // batch_size) + 1
@@ -260,12 +341,17 @@ class TechnicalIndicatorFixer:
 
             for file_path, ticker in batch:
                 print(f"   Processing {ticker}...", end=' ')
+                calls_before = self.stats['api_calls']
                 success = self.fix_single_file(file_path, ticker)
                 if success:
                     print("✅")
                 else:
                     print("⏭️")
 
+                # Only single-symbol fallback requests count against the pacing below
+                if self.stats['api_calls'] == calls_before:
+                    continue
+
                 # Rate limit: Alpaca allows 200 requests/minute
                 if self.stats['api_calls'] % 190 == 0 and self.stats['api_calls'] > 0:
                     print("   ⏳ Rate limit pause (60 seconds)...")
@@ -278,6 +364,8 @@ class TechnicalIndicatorFixer:
             print(f"   📊 Progress: {progress_pct:.1f}% | Added: {self.stats['technical_added']} | "
                   f"Skipped: {self.stats['already_has_technical']} | Errors: {self.stats['errors']}")
 
+        self.history.save()
+
         # Final summary
         elapsed = (datetime.now() - start_time).total_seconds()
         print("\n" + "="*80)
@@ -14,92 +14,183 @@ Usage:
     python validate_data_quality.py --range 2025-09-15 2025-09-18
 """
 
-import json
+import os
+import orjson
+from bisect import bisect_right
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+# Major stocks reported individually in the sample analysis
+SAMPLE_TICKERS = frozenset({'AAPL', 'MSFT', 'NVDA', 'GOOGL', 'TSLA', 'AMZN', 'META'})
+
+# Grade tiers: a date reaches tier i when both coverages meet the i-th thresholds
+TECH_THRESHOLDS = [70, 85, 95, 99]
+FUND_THRESHOLDS = [70, 80, 90, 99]
+GRADES = ['C', 'B', 'B+', 'A', 'A+']
+QUALITY_SCORES = [60.0, 75.0, 85.0, 95.0, 99.9]
+
+# Top-level keys that count as technical / fundamental coverage
+TECH_KEYS = (b'technical_indicators', b'technical')
+FUND_KEYS = (b'fundamentals', b'fundamental')
+
+
+def _has_top_level_key(raw: bytes, key: bytes) -> Optional[bool]:
+    """Check for a top-level key without parsing the file.
+
+    Daily files are written with indent=2, so a top-level key starts a line with
+    exactly two spaces. Returns None when the key only appears elsewhere and a full
+    parse has to decide.
+    """
+    if b'"' + key + b'"' not in raw:
+        return False
+    if b'\n  "' + key + b'":' in raw:
+        return True
+    return None
+
+
+def _probe(file_path: str, ticker: str) -> Optional[Tuple[bool, bool, Optional[Dict]]]:
+    """Check one ticker's daily file in a worker process.
+
+    Returns None when the file does not exist, otherwise (has_tech, has_fund, sample)
+    where sample is only filled in for SAMPLE_TICKERS.
+    """
+    if not os.path.exists(file_path):
+        return None
+
+    try:
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+    except Exception:
+        return False, False, None
+
+    # Coverage flags alone don't need the dict tree; only sample tickers are parsed
+    if ticker not in SAMPLE_TICKERS:
+        tech = [_has_top_level_key(raw, key) for key in TECH_KEYS]
+        fund = [_has_top_level_key(raw, key) for key in FUND_KEYS]
+        if None not in tech and None not in fund:
+            return any(tech), any(fund), None
+
+    try:
+        data = orjson.loads(raw)
+    except Exception:
+        return False, False, None
+
+    # Check for technical indicators (multiple possible structures)
+    has_tech = ('technical_indicators' in data or 'technical' in data)
+
+    # Check for fundamental data
+    has_fund = ('fundamentals' in data or 'fundamental' in data)
+
+    # Collect sample for detailed analysis
+    sample = None
+    if ticker in SAMPLE_TICKERS:
+        tech_count = 0
+        fund_count = 0
+
+        if 'technical_indicators' in data:
+            tech_count = len(data['technical_indicators'])
+        elif 'technical' in data:
+            tech_count = len(data['technical'])
+
+        if 'fundamentals' in data:
+            fund_count = len(data['fundamentals'])
+        elif 'fundamental' in data:
+            fund_count = len(data['fundamental'])
+
+        sample = {
+            'ticker': ticker,
+            'tech_count': tech_count,
+            'fund_count': fund_count,
+            'has_tech': has_tech,
+            'has_fund': has_fund
+        }
+
+    return has_tech, has_fund, sample
+
 
 class DataQualityValidator:
-    def __init__(self, base_path='/workspaces/data/historical/daily'):
+    def __init__(self, base_path='/workspaces/data/historical/daily', workers=None):
         self.base_path = Path(base_path)
+        self.workers = workers or os.cpu_count() or 1
+
+    def _scan_all(self, dates) -> Dict[str, List[Tuple[str, str]]]:
+        """Map each date to its (file_path, ticker) daily files in one traversal.
+
+        Every ticker directory is visited once and each <year>/<month>/ folder that
+        any of the dates falls in is listed once, however many dates are requested.
+        """
+        dates = set(dates)
+        # Relative <year>/<month> folders, formatted once instead of joined per ticker
+        month_dirs = sorted({f"{os.sep}{date[:4]}{os.sep}{date[5:7]}" for date in dates})
+        files: Dict[str, List[Tuple[str, str]]] = {date: [] for date in dates}
+
+        with os.scandir(self.base_path) as tickers:
+            for ticker_entry in tickers:
+                if not ticker_entry.is_dir():
+                    continue
+                for month_dir in month_dirs:
+                    try:
+                        with os.scandir(ticker_entry.path + month_dir) as entries:
+                            for entry in entries:
+                                date = entry.name[:-5]
+                                if entry.name.endswith('.json') and date in dates:
+                                    files[date].append((entry.path, ticker_entry.name))
+                    except (FileNotFoundError, NotADirectoryError):
+                        continue
+        return files
+
+    def _probe_files(self, files: List[Tuple[str, str]], executor: ProcessPoolExecutor) -> List:
+        paths = [file_path for file_path, _ in files]
+        tickers = [ticker for _, ticker in files]
+        return list(executor.map(_probe, paths, tickers, chunksize=64))
+
+    def validate_single_date(self, target_date: str, files: Optional[List[Tuple[str, str]]] = None,
+                             executor: Optional[ProcessPoolExecutor] = None) -> Dict:
+        """Validate data quality for a single date.
 
-    def validate_single_date(self, target_date: str) -> Dict:
-        """Validate data quality for a single date"""
+        files are pre-scanned (path, ticker) pairs and executor a shared worker pool;
+        both are created for this call when not given.
+        """
         print(f"📋 Validating data quality for {target_date}")
         print("=" * 60)
 
+        if files is None:
+            files = self._scan_all([target_date])[target_date]
+
         # Count files and coverage
         total_files = 0
         tech_files = 0
         fund_files = 0
         sample_data = []
 
-        for ticker_dir in self.base_path.iterdir():
-            if ticker_dir.is_dir():
-                file_path = ticker_dir / '2025' / target_date.split('-')[1] / f'{target_date}.json'
-                if file_path.exists():
-                    total_files += 1
-                    try:
-                        with open(file_path, 'r') as f:
-                            data = json.load(f)
-
-                        # Check for technical indicators (multiple possible structures)
-                        has_tech = ('technical_indicators' in data or 'technical' in data)
-                        if has_tech:
-                            tech_files += 1
-
-                        # Check for fundamental data
-                        has_fund = ('fundamentals' in data or 'fundamental' in data)
-                        if has_fund:
-                            fund_files += 1
-
-                        # Collect sample for detailed analysis
-                        if ticker_dir.name in ['AAPL', 'MSFT', 'NVDA', 'GOOGL', 'TSLA', 'AMZN', 'META']:
-                            tech_count = 0
-                            fund_count = 0
-
-                            if 'technical_indicators' in data:
-                                tech_count = len(data['technical_indicators'])
-                            elif 'technical' in data:
-                                tech_count = len(data['technical'])
-
-                            if 'fundamentals' in data:
-                                fund_count = len(data['fundamentals'])
-                            elif 'fundamental' in data:
-                                fund_count = len(data['fundamental'])
-
-                            sample_data.append({
-                                'ticker': ticker_dir.name,
-                                'tech_count': tech_count,
-                                'fund_count': fund_count,
-                                'has_tech': has_tech,
-                                'has_fund': has_fund
-                            })
-
-                    except Exception as e:
-                        continue
+        # Reading and parsing happen in the workers
+        if executor is None:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                probes = self._probe_files(files, executor)
+        else:
+            probes = self._probe_files(files, executor)
+
+        for probe in probes:
+            if probe is None:
+                continue
+            has_tech, has_fund, sample = probe
+            total_files += 1
+            if has_tech:
+                tech_files += 1
+            if has_fund:
+                fund_files += 1
+            if sample is not None:
+                sample_data.append(sample)
 
         # Calculate metrics
         tech_coverage = (tech_files / total_files * 100) if total_files > 0 else 0
         fund_coverage = (fund_files / total_files * 100) if total_files > 0 else 0
 
         # Determine grade
-        if tech_coverage >= 99 and fund_coverage >= 99:
-            grade = "A+"
-            quality_score = 99.9
-        elif tech_coverage >= 95 and fund_coverage >= 90:
-            grade = "A"
-            quality_score = 95.0
-        elif tech_coverage >= 85 and fund_coverage >= 80:
-            grade = "B+"
-            quality_score = 85.0
-        elif tech_coverage >= 70 and fund_coverage >= 70:
-            grade = "B"
-            quality_score = 75.0
-        else:
-            grade = "C"
-            quality_score = 60.0
+        grade, quality_score = self.grade(tech_coverage, fund_coverage)
 
         # Print results
         print(f"📁 Total Files: {total_files}")
@@ -124,20 +215,31 @@ class DataQualityValidator:
             'sample_data': sample_data
         }
 
+    @staticmethod
+    def grade(tech_coverage: float, fund_coverage: float) -> Tuple[str, float]:
+        """Grade and quality score for a pair of coverage percentages"""
+        tier = min(bisect_right(TECH_THRESHOLDS, tech_coverage),
+                   bisect_right(FUND_THRESHOLDS, fund_coverage))
+        return GRADES[tier], QUALITY_SCORES[tier]
+
     def validate_date_range(self, start_date: str, end_date: str) -> List[Dict]:
         """Validate data quality for a date range"""
-        start = datetime.strptime(start_date, '%Y-%m-%d')
-        end = datetime.strptime(end_date, '%Y-%m-%d')
+        start = datetime.strptime(start_date, '%Y-%m-%d').date()
+        end = datetime.strptime(end_date, '%Y-%m-%d').date()
+
+        # date.isoformat() is already YYYY-MM-DD, no strftime format parsing per day
+        dates = [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+
+        # One directory traversal for the whole range
+        files_by_date = self._scan_all(dates)
 
+        # One worker pool for the whole range, so workers stay warm between dates
         results = []
-        current = start
-
-        while current <= end:
-            date_str = current.strftime('%Y-%m-%d')
-            result = self.validate_single_date(date_str)
-            results.append(result)
-            print()  # Add spacing between dates
-            current += timedelta(days=1)
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            for date_str in dates:
+                result = self.validate_single_date(date_str, files_by_date[date_str], executor)
+                results.append(result)
+                print()  # Add spacing between dates
 
         return results
 
@@ -0,0 +1,28 @@
+"""
+Directory scans shared by the failure analysis scripts.
+"""
+
+import os
+
+
+def count_json_files(path: str) -> int:
+    """Number of .json files under path, walked with an explicit scandir stack.
+
+    Counts the same files os.walk would: symlinked directories are not descended
+    into and unreadable directories are skipped.
+    """
+    count = 0
+    stack = [path]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if not entry.is_symlink():
+                        stack.append(entry.path)
+                elif entry.name.endswith('.json'):
+                    count += 1
+    return count
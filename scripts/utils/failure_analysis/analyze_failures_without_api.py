@@ -8,18 +8,39 @@ without requiring Polygon API access.
 
 import os
 import json
+import orjson
 from datetime import datetime
 from collections import defaultdict
 from typing import Dict, List, Any
 import logging
 
+import numpy as np
+import pandas as pd
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Input record fields used for categorization (with the default for a missing key);
+# nothing else is kept in memory
+INPUT_DEFAULTS = {'market_cap': 0, 'country': 'Unknown', 'exchange': 'Unknown'}
+
+# Upper-cased country names that count as US listings
+_US_COUNTRIES = frozenset({'UNITED STATES', 'US', 'USA', 'U.S.', 'U.S.A.'})
+
+# Categories whose report samples show a formatted market cap
+_FORMATTED_CAP_CATEGORIES = frozenset({'VERY_LOW_MARKET_CAP', 'LOW_MARKET_CAP', 'VALID_LARGE_CAP'})
+
 class FailureAnalyzerNoAPI:
     def __init__(self):
         self.error_records_path = "/workspaces/data/error_records/polygon_failures"
         self.input_source_path = "/workspaces/data/input_source"
+        self._ensured_dirs = set()
+
+    def _ensure_dir(self, path: str):
+        """os.makedirs once per directory for the lifetime of the analyzer"""
+        if path not in self._ensured_dirs:
+            os.makedirs(path, exist_ok=True)
+            self._ensured_dirs.add(path)
 
     def analyze_failures(self):
         """Analyze failures using available data"""
@@ -27,10 +48,7 @@ class FailureAnalyzerNoAPI:
 
         # Load data
         failed_tickers = self._load_failed_tickers()
-        input_data = self._load_input_data()
-
-        # Create lookup
-        input_lookup = {item['ticker']: item for item in input_data}
+        input_lookup = self._load_input_data()
 
         # Categorize based on available data
         categorized = self._categorize_without_api(failed_tickers, input_lookup)
@@ -47,26 +65,35 @@ class FailureAnalyzerNoAPI:
         """Load failed tickers list"""
         analysis_file = f"{self.error_records_path}/final_reports/complete_analysis_20250926_210449.json"
 
-        with open(analysis_file, 'r') as f:
-            analysis = json.load(f)
+        with open(analysis_file, 'rb') as f:
+            analysis = orjson.loads(f.read())
 
         unknown_failures = analysis['detailed_breakdown']['failed_collections']['categories']['UNKNOWN']['tickers']
         return [item['ticker'] for item in unknown_failures]
 
-    def _load_input_data(self) -> List[Dict[str, Any]]:
-        """Load YFinance input data"""
+    def _load_input_data(self) -> Dict[str, Dict[str, Any]]:
+        """Load YFinance input data as a ticker lookup of the fields used for categorization"""
         try:
-            yfinance_files = [f for f in os.listdir(self.input_source_path)
-                            if f.startswith("enriched_yfinance_")]
-            if not yfinance_files:
-                return []
-
-            latest_file = sorted(yfinance_files)[-1]
-            with open(f"{self.input_source_path}/{latest_file}", 'r') as f:
-                return json.load(f)
+            # Names embed the timestamp, so the latest file is the greatest name (one pass, no sort)
+            latest = None
+            with os.scandir(self.input_source_path) as entries:
+                for entry in entries:
+                    if entry.name.startswith("enriched_yfinance_") and (latest is None or entry.name > latest.name):
+                        latest = entry
+            if latest is None:
+                return {}
+
+            # stdlib json on purpose: collect_us_market_stocks.py writes this file with json.dump,
+            # so it can hold NaN/Infinity from raw yfinance info, which orjson rejects
+            with open(latest.path, 'r') as f:
+                input_data = json.load(f)
+
+            # Keep only the categorization fields so the full records can be freed right away
+            return {item['ticker']: {k: item.get(k, default) for k, default in INPUT_DEFAULTS.items()}
+                    for item in input_data}
         except Exception as e:
             logger.warning(f"Could not load input data: {e}")
-            return []
+            return {}
 
     def _categorize_without_api(self, failed_tickers: List[str],
                                input_lookup: Dict[str, Any]) -> Dict[str, Any]:
@@ -106,55 +133,49 @@ class FailureAnalyzerNoAPI:
             }
         }
 
-        # Categorize each ticker
-        for ticker in failed_tickers:
+        # Categorize all tickers at once with vectorized masks, in priority order
+        lookup = pd.DataFrame.from_dict(input_lookup, orient='index',
+                                        columns=['market_cap', 'country', 'exchange'])
+        failed = lookup.reindex(failed_tickers)
+        country = failed['country'].astype(object)
+        # The frame turns a null market cap into NaN; an object Series keeps null (no data)
+        # apart from a NaN value, which compares as neither zero nor small like it always did
+        raw_market_cap = pd.Series({ticker: info['market_cap'] for ticker, info in input_lookup.items()},
+                                   dtype=object).reindex(failed_tickers)
+        market_cap = pd.to_numeric(raw_market_cap, errors='coerce')
+
+        not_found = ~failed.index.isin(lookup.index)
+        non_us = country.notna() & country.ne('') & ~country.str.upper().isin(_US_COUNTRIES)
+        no_data = market_cap.eq(0) | raw_market_cap.map(lambda value: value is None)
+        labels = np.select(
+            [not_found, non_us, no_data, market_cap.lt(1_000_000_000), market_cap.lt(2_000_000_000)],
+            ['INSUFFICIENT_DATA', 'NON_US_MARKET', 'NO_MARKET_DATA', 'VERY_LOW_MARKET_CAP', 'LOW_MARKET_CAP'],
+            default='VALID_LARGE_CAP'
+        )
+
+        # Entries are built from the original input values so JSON types are unchanged
+        for ticker, category in zip(failed_tickers, labels):
             ticker_info = input_lookup.get(ticker, {})
+            market_cap_value = ticker_info.get('market_cap', 0)
 
-            if not ticker_info:
-                categories['INSUFFICIENT_DATA']['tickers'].append({
-                    'ticker': ticker,
-                    'market_cap': 0,
-                    'issue': 'Not found in input data'
-                })
-                continue
-
-            market_cap = ticker_info.get('market_cap', 0)
-            country = ticker_info.get('country', 'Unknown')
-            exchange = ticker_info.get('exchange', 'Unknown')
-
-            # Categorization logic
-            if country and country.upper() not in ['UNITED STATES', 'US', 'USA']:
-                categories['NON_US_MARKET']['tickers'].append({
+            if category == 'INSUFFICIENT_DATA':
+                entry = {'ticker': ticker, 'market_cap': 0, 'issue': 'Not found in input data'}
+            elif category == 'NON_US_MARKET':
+                entry = {
                     'ticker': ticker,
-                    'market_cap': market_cap,
-                    'country': country,
-                    'exchange': exchange
-                })
-            elif market_cap == 0 or market_cap is None:
-                categories['NO_MARKET_DATA']['tickers'].append({
-                    'ticker': ticker,
-                    'market_cap': market_cap,
-                    'issue': 'Missing or zero market cap'
-                })
-            elif market_cap < 1_000_000_000:  # < $1B
-                categories['VERY_LOW_MARKET_CAP']['tickers'].append({
-                    'ticker': ticker,
-                    'market_cap': market_cap,
-                    'market_cap_formatted': f'${market_cap:,.0f}'
-                })
-            elif market_cap < 2_000_000_000:  # $1B - $2B
-                categories['LOW_MARKET_CAP']['tickers'].append({
-                    'ticker': ticker,
-                    'market_cap': market_cap,
-                    'market_cap_formatted': f'${market_cap:,.0f}'
-                })
-            else:  # >= $2B
-                categories['VALID_LARGE_CAP']['tickers'].append({
-                    'ticker': ticker,
-                    'market_cap': market_cap,
-                    'market_cap_formatted': f'${market_cap:,.0f}',
-                    'note': 'Unexpected failure - requires API investigation'
-                })
+                    'market_cap': market_cap_value,
+                    'country': ticker_info['country'],
+                    'exchange': ticker_info['exchange']
+                }
+            elif category == 'NO_MARKET_DATA':
+                entry = {'ticker': ticker, 'market_cap': market_cap_value, 'issue': 'Missing or zero market cap'}
+            else:
+                # market_cap_formatted is added at report time, only for the sample tickers
+                entry = {'ticker': ticker, 'market_cap': market_cap_value}
+                if category == 'VALID_LARGE_CAP':
+                    entry['note'] = 'Unexpected failure - requires API investigation'
+
+            categories[category]['tickers'].append(entry)
 
         # Calculate counts and percentages
         total_failures = len(failed_tickers)
@@ -206,8 +227,9 @@ class FailureAnalyzerNoAPI:
                     'percentage': data['percentage'],
                     'description': data['description'],
                     'reason': data['reason'],
-                    'sample_tickers': data['tickers'][:10],  # First 10
-                    'all_tickers': [t['ticker'] if isinstance(t, dict) else t for t in data['tickers']]
+                    'sample_tickers': [self._format_sample(t) for t in data['tickers'][:10]]
+                                      if cat in _FORMATTED_CAP_CATEGORIES else data['tickers'][:10],  # First 10
+                    'all_tickers': [t['ticker'] for t in data['tickers']]
                 }
                 for cat, data in sorted_categories if data['count'] > 0
             },
@@ -227,6 +249,17 @@ class FailureAnalyzerNoAPI:
 
         return report
 
+    @staticmethod
+    def _format_sample(entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of a ticker entry with market_cap_formatted right after market_cap"""
+        sample = {
+            'ticker': entry['ticker'],
+            'market_cap': entry['market_cap'],
+            'market_cap_formatted': f"${entry['market_cap']:,.0f}"
+        }
+        sample.update(entry)
+        return sample
+
     def _generate_insights(self, categorized: Dict[str, Any]) -> List[str]:
         """Generate key insights"""
         insights = []
@@ -343,22 +376,24 @@ class FailureAnalyzerNoAPI:
     def _save_report(self, report: Dict[str, Any]):
         """Save analysis report"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        os.makedirs(f"{self.error_records_path}/no_api_analysis", exist_ok=True)
+        report_dir = f"{self.error_records_path}/no_api_analysis"
 
         # Save full report
-        report_path = f"{self.error_records_path}/no_api_analysis/failure_analysis_{timestamp}.json"
-        with open(report_path, 'w') as f:
-            json.dump(report, f, indent=2)
+        self._ensure_dir(report_dir)
+        report_path = f"{report_dir}/failure_analysis_{timestamp}.json"
+        with open(report_path, 'wb') as f:
+            f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
 
         # Save ticker lists by category
         for category, data in report['detailed_breakdown'].items():
-            ticker_list_path = f"{self.error_records_path}/no_api_analysis/tickers_{category.lower()}_{timestamp}.json"
-            with open(ticker_list_path, 'w') as f:
-                json.dump({
+            self._ensure_dir(report_dir)
+            ticker_list_path = f"{report_dir}/tickers_{category.lower()}_{timestamp}.json"
+            with open(ticker_list_path, 'wb') as f:
+                f.write(orjson.dumps({
                     'category': category,
                     'count': data['count'],
                     'tickers': data['all_tickers']
-                }, f, indent=2)
+                }, option=orjson.OPT_INDENT_2))
 
         logger.info(f"Report saved to {report_path}")
         logger.info(f"Ticker lists saved for {len(report['detailed_breakdown'])} categories")
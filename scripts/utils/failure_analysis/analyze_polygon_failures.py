@@ -8,9 +8,13 @@ for tracking, investigation, and remediation.
 
 import os
 import json
+import time
+import heapq
 import asyncio
 import aiohttp
+import orjson
 from datetime import datetime, timedelta
+from types import MappingProxyType
 from collections import defaultdict, Counter
 from typing import Dict, List, Any, Optional
 import logging
@@ -21,6 +25,178 @@ from pathlib import Path
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Polygon responses that describe the ticker rather than the moment (2xx and 404) are
+# reused across runs; auth errors, rate limits and server errors are always re-fetched
+REFERENCE_TTL = 7 * 24 * 3600
+AGGREGATE_TTL = 24 * 3600
+
+# Seconds to hold back new requests after a 429 that carries no usable Retry-After
+RATE_LIMIT_BACKOFF = 30
+
+# Probe HTTP status -> (category, reason); any other 4xx/5xx is an API_ERROR
+REFERENCE_STATUS_MAP = {
+    404: ('TICKER_NOT_FOUND', "Ticker {ticker} not found in Polygon API"),
+    429: ('RATE_LIMIT', "Rate limit exceeded during analysis"),
+}
+AGGREGATE_STATUS_MAP = {
+    404: ('NO_DATA', "No historical data available for {test_date}"),
+    429: ('RATE_LIMIT', "Rate limit exceeded during data test"),
+}
+
+# Static per-category report text, looked up by the _get_* helpers
+CATEGORY_RECOMMENDATIONS = {
+    'NO_DATA': [
+        "Verify ticker symbols are correct and active",
+        "Check if data is available for the requested date range",
+        "Consider alternative data sources for missing tickers"
+    ],
+    'API_ERROR': [
+        "Review API key permissions and quotas",
+        "Implement exponential backoff for retries",
+        "Monitor API status and service announcements"
+    ],
+    'RATE_LIMIT': [
+        "Implement request throttling (max 5 requests/minute for free tier)",
+        "Consider upgrading to higher tier API plan",
+        "Add delays between batch requests"
+    ],
+    'TICKER_NOT_FOUND': [
+        "Validate ticker symbols against current market listings",
+        "Update ticker list to remove invalid symbols",
+        "Cross-reference with multiple data sources"
+    ],
+    'DELISTED': [
+        "Filter out delisted stocks from collection list",
+        "Implement delisting date checks",
+        "Update ticker universe regularly"
+    ],
+    'INSUFFICIENT_HISTORY': [
+        "Adjust historical lookback period requirements",
+        "Handle newly listed stocks separately",
+        "Consider shorter history for recent IPOs"
+    ],
+    'DATA_QUALITY': [
+        "Implement data validation checks",
+        "Handle missing OHLCV data gracefully",
+        "Flag incomplete data for manual review"
+    ],
+    'NETWORK_ERROR': [
+        "Implement retry logic for transient failures",
+        "Add connection timeout handling",
+        "Monitor network connectivity"
+    ],
+    'TIMEOUT': [
+        "Increase request timeout values",
+        "Implement asynchronous processing",
+        "Break large requests into smaller batches"
+    ],
+    'UNKNOWN': [
+        "Enable detailed error logging",
+        "Implement comprehensive exception handling",
+        "Review API documentation for edge cases"
+    ]
+}
+
+PRIORITY_ACTIONS = {
+    'NO_DATA': "Update ticker validation process",
+    'API_ERROR': "Review API configuration and error handling",
+    'RATE_LIMIT': "Implement proper request throttling",
+    'TICKER_NOT_FOUND': "Clean up ticker list",
+    'DELISTED': "Filter delisted stocks",
+    'INSUFFICIENT_HISTORY': "Adjust history requirements",
+    'DATA_QUALITY': "Enhance data validation",
+    'NETWORK_ERROR': "Improve error handling",
+    'TIMEOUT': "Optimize request timing",
+    'UNKNOWN': "Enhance error logging"
+}
+
+ACTION_TIMELINES = {
+    'NO_DATA': "1 week",
+    'API_ERROR': "3 days",
+    'RATE_LIMIT': "1 day",
+    'TICKER_NOT_FOUND': "2 days",
+    'DELISTED': "1 day",
+    'INSUFFICIENT_HISTORY': "2 days",
+    'DATA_QUALITY': "1 week",
+    'NETWORK_ERROR': "3 days",
+    'TIMEOUT': "1 day",
+    'UNKNOWN': "1 week"
+}
+
+IMPLEMENTATION_STEPS = {
+    'RATE_LIMIT': [
+        "1. Add request delay configuration",
+        "2. Implement rate limiting decorator",
+        "3. Test with smaller batches",
+        "4. Monitor success rate improvement"
+    ],
+    'TICKER_NOT_FOUND': [
+        "1. Export failed ticker list",
+        "2. Cross-reference with current market data",
+        "3. Remove invalid tickers from input data",
+        "4. Re-run collection for remaining tickers"
+    ],
+    'DELISTED': [
+        "1. Query delisting dates from API",
+        "2. Add delisting filter to collection logic",
+        "3. Update ticker universe monthly",
+        "4. Document delisted tickers for reference"
+    ]
+}
+
+
+def _classify_status(status: int, status_map: Dict[int, tuple], error_reason: str,
+                     **fields) -> Optional[tuple]:
+    """(category, reason) for a failed probe response, or None if it succeeded"""
+    hit = status_map.get(status)
+    if hit is not None:
+        return hit[0], hit[1].format(**fields)
+    if status >= 400:
+        return 'API_ERROR', error_reason.format(status=status)
+    return None
+
+
+def _format_pct(part: float, whole: float) -> str:
+    """part as a one-decimal percentage of whole, or N/A when whole is not positive"""
+    return f"{(part / whole) * 100:.1f}%" if whole > 0 else "N/A"
+
+
+class TickerProbeCache:
+    """On-disk TTL cache of Polygon probe responses, one small JSON file per ticker"""
+
+    def __init__(self, cache_dir: str = "/workspaces/data/cache/polygon_ticker"):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, ticker: str) -> Path:
+        return self.cache_dir / f"{ticker.replace('/', '_')}.json"
+
+    def _read(self, ticker: str) -> Dict[str, Any]:
+        try:
+            with open(self._path(ticker), 'rb') as f:
+                return orjson.loads(f.read())
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            return {}
+
+    def get(self, ticker: str, kind: str, ttl: float) -> Optional[tuple]:
+        """(status, body) cached for this probe kind, or None if missing or expired"""
+        entry = self._read(ticker).get(kind)
+        if entry is None or entry['ts'] <= time.time() - ttl:
+            return None
+        return entry['status'], entry['body']
+
+    def put(self, ticker: str, kind: str, status: int, body: Optional[Dict[str, Any]]):
+        entries = self._read(ticker)
+        entries[kind] = {'ts': time.time(), 'status': status, 'body': body}
+
+        # Write-then-rename so a concurrent reader or a crash never sees a half-written file
+        path = self._path(ticker)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(entries))
+        os.replace(tmp_path, path)
+
+
 class PolygonFailureAnalyzer:
     def __init__(self, polygon_api_key: str = None):
         self.polygon_api_key = polygon_api_key or os.getenv('POLYGON_API_KEY')
@@ -41,6 +217,11 @@ class PolygonFailureAnalyzer:
             'UNKNOWN': 'Unknown/unclassified error'
         }
 
+        # Bound in-flight API requests to what the Polygon tier sustains
+        self._sem = asyncio.Semaphore(int(os.getenv("POLYGON_MAX_CONCURRENCY", "5")))
+        self._resume_at = 0.0  # monotonic time before which no new request is sent
+        self.probe_cache = TickerProbeCache()
+
         # Create error records directory
         os.makedirs(self.error_records_path, exist_ok=True)
 
@@ -55,8 +236,11 @@ class PolygonFailureAnalyzer:
         # Get expected vs actual tickers
         failed_tickers = await self._identify_failed_tickers(start_date, end_date)
 
-        # Categorize failures
-        failure_analysis = await self._categorize_failures(failed_tickers, start_date, end_date)
+        # Categorize failures over one shared connection pool
+        connector = aiohttp.TCPConnector(limit=100, limit_per_host=20, ttl_dns_cache=300)
+        async with aiohttp.ClientSession(connector=connector,
+                                         timeout=aiohttp.ClientTimeout(total=30)) as session:
+            failure_analysis = await self._categorize_failures(session, failed_tickers, start_date, end_date)
 
         # Generate reports
         await self._generate_failure_reports(failure_analysis, collection_summary, filtered_tickers)
@@ -67,8 +251,8 @@ class PolygonFailureAnalyzer:
         """Load collection summary from polygon data"""
         summary_path = f"{self.base_path}/collection_summary.json"
         try:
-            with open(summary_path, 'r') as f:
-                return json.load(f)
+            with open(summary_path, 'rb') as f:
+                return orjson.loads(f.read())
         except FileNotFoundError:
             logger.warning(f"Collection summary not found at {summary_path}")
             return {}
@@ -77,12 +261,36 @@ class PolygonFailureAnalyzer:
         """Load filtered tickers data"""
         filtered_path = f"{self.base_path}/filtered_tickers.json"
         try:
-            with open(filtered_path, 'r') as f:
-                return json.load(f)
+            with open(filtered_path, 'rb') as f:
+                return orjson.loads(f.read())
         except FileNotFoundError:
             logger.warning(f"Filtered tickers not found at {filtered_path}")
             return {}
 
+    @staticmethod
+    def _dump(path: str, obj: Any):
+        """Write obj as indented JSON"""
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2, default=str))
+
+    @staticmethod
+    def _stream_detailed_report(path: str, header: Dict[str, Any], ticker_details: Dict[str, Any]):
+        """Write the detailed report with entries sorted by category (for easier review).
+
+        Entries are encoded one at a time, in the same indented layout _dump produces,
+        so no sorted copy of the details or whole-report buffer is built.
+        """
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(header, option=orjson.OPT_INDENT_2)[:-2])
+            f.write(b',\n  "ticker_failures": {')
+            separator = b'\n    '
+            for ticker in sorted(ticker_details, key=lambda t: ticker_details[t]['category']):
+                # default=dict encodes the shared read-only entries of a no-API-key run
+                entry = orjson.dumps(ticker_details[ticker], option=orjson.OPT_INDENT_2, default=dict)
+                f.write(separator + orjson.dumps(ticker) + b': ' + entry.replace(b'\n', b'\n    '))
+                separator = b',\n    '
+            f.write(b'\n  }\n}' if ticker_details else b'}\n}')
+
     async def _identify_failed_tickers(self, start_date: str, end_date: str) -> List[str]:
         """Identify tickers that failed collection"""
         logger.info("Identifying failed tickers...")
@@ -91,27 +299,29 @@ class PolygonFailureAnalyzer:
         input_source_path = "/workspaces/data/input_source"
         expected_tickers = set()
 
-        # Find latest enriched yfinance file
-        yfinance_files = [f for f in os.listdir(input_source_path) if f.startswith("enriched_yfinance_")]
-        if yfinance_files:
-            latest_file = sorted(yfinance_files)[-1]
+        # Find latest enriched yfinance file (names embed the timestamp, so the greatest name wins)
+        with os.scandir(input_source_path) as entries:
+            latest_file = max((e.name for e in entries if e.name.startswith("enriched_yfinance_")), default=None)
+        if latest_file is not None:
+            # stdlib json on purpose: collect_us_market_stocks.py writes this file with json.dump,
+            # so it can hold NaN/Infinity from raw yfinance info, which orjson rejects
             with open(f"{input_source_path}/{latest_file}", 'r') as f:
                 yfinance_data = json.load(f)
-                # Handle both dict and list formats
-                if isinstance(yfinance_data, dict):
-                    expected_tickers = set(yfinance_data.keys())
-                elif isinstance(yfinance_data, list):
-                    expected_tickers = {item['ticker'] for item in yfinance_data if 'ticker' in item}
-                else:
-                    logger.warning(f"Unexpected data format in {latest_file}")
-                    expected_tickers = set()
+            # Handle both dict and list formats; only the ticker names are kept
+            if isinstance(yfinance_data, dict):
+                expected_tickers = set(yfinance_data)
+            elif isinstance(yfinance_data, list):
+                expected_tickers = {item['ticker'] for item in yfinance_data if 'ticker' in item}
+            else:
+                logger.warning(f"Unexpected data format in {latest_file}")
+            del yfinance_data
 
         # Get tickers that actually have data
         collected_tickers = set()
         if os.path.exists(self.base_path):
-            collected_tickers = {d for d in os.listdir(self.base_path)
-                               if os.path.isdir(os.path.join(self.base_path, d))
-                               and not d.startswith('.')}
+            with os.scandir(self.base_path) as entries:
+                collected_tickers = {e.name for e in entries
+                                     if not e.name.startswith('.') and e.is_dir()}
 
         # Failed tickers = expected - collected
         failed_tickers = list(expected_tickers - collected_tickers)
@@ -119,7 +329,8 @@ class PolygonFailureAnalyzer:
 
         return failed_tickers
 
-    async def _categorize_failures(self, failed_tickers: List[str], start_date: str, end_date: str) -> Dict[str, Any]:
+    async def _categorize_failures(self, session: aiohttp.ClientSession, failed_tickers: List[str],
+                                   start_date: str, end_date: str) -> Dict[str, Any]:
         """Categorize failures by reason"""
         logger.info(f"Categorizing {len(failed_tickers)} failures...")
 
@@ -128,7 +339,7 @@ class PolygonFailureAnalyzer:
             'period': f"{start_date} to {end_date}",
             'total_failures': len(failed_tickers),
             'categories': defaultdict(list),
-            'category_counts': defaultdict(int),
+            'category_counts': Counter(),
             'ticker_details': {}
         }
 
@@ -136,7 +347,7 @@ class PolygonFailureAnalyzer:
         batch_size = 50
         for i in range(0, len(failed_tickers), batch_size):
             batch = failed_tickers[i:i + batch_size]
-            await self._analyze_ticker_batch(batch, failure_data)
+            await self._analyze_ticker_batch(session, batch, failure_data)
 
             # Progress update
             completed = min(i + batch_size, len(failed_tickers))
@@ -151,86 +362,105 @@ class PolygonFailureAnalyzer:
 
         return failure_data
 
-    async def _analyze_ticker_batch(self, tickers: List[str], failure_data: Dict[str, Any]):
+    async def _analyze_ticker_batch(self, session: aiohttp.ClientSession, tickers: List[str],
+                                    failure_data: Dict[str, Any]):
         """Analyze a batch of failed tickers"""
         if not self.polygon_api_key:
-            # Without API key, classify as UNKNOWN
-            for ticker in tickers:
-                category = 'UNKNOWN'
-                failure_data['categories'][category].append(ticker)
-                failure_data['category_counts'][category] += 1
-                failure_data['ticker_details'][ticker] = {
-                    'category': category,
-                    'reason': 'API key not available for detailed analysis',
-                    'timestamp': datetime.now().isoformat()
-                }
+            # Without API key, classify the whole batch as UNKNOWN; every ticker shares
+            # one read-only details entry since nothing about it is ticker-specific
+            details = MappingProxyType({
+                'category': 'UNKNOWN',
+                'reason': 'API key not available for detailed analysis',
+                'timestamp': datetime.now().isoformat()
+            })
+            failure_data['categories']['UNKNOWN'].extend(tickers)
+            failure_data['category_counts']['UNKNOWN'] += len(tickers)
+            failure_data['ticker_details'].update(dict.fromkeys(tickers, details))
             return
 
         # Analyze with API calls
-        async with aiohttp.ClientSession() as session:
-            tasks = [self._analyze_single_ticker(session, ticker) for ticker in tickers]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            for ticker, result in zip(tickers, results):
-                if isinstance(result, Exception):
-                    category = 'NETWORK_ERROR'
-                    reason = f"Analysis failed: {str(result)}"
-                else:
-                    category, reason = result
-
-                failure_data['categories'][category].append(ticker)
-                failure_data['category_counts'][category] += 1
-                failure_data['ticker_details'][ticker] = {
-                    'category': category,
-                    'reason': reason,
-                    'timestamp': datetime.now().isoformat()
-                }
+        tasks = [self._analyze_single_ticker(session, ticker) for ticker in tickers]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        outcomes = [('NETWORK_ERROR', f"Analysis failed: {str(result)}") if isinstance(result, Exception)
+                    else result for result in results]
+        failure_data['category_counts'].update(category for category, _ in outcomes)
+
+        timestamp = datetime.now().isoformat()
+        for ticker, (category, reason) in zip(tickers, outcomes):
+            failure_data['categories'][category].append(ticker)
+            failure_data['ticker_details'][ticker] = {
+                'category': category,
+                'reason': reason,
+                'timestamp': timestamp
+            }
+
+    def _pause_for_rate_limit(self, retry_after: Optional[str]):
+        """Hold back every new request until Polygon's rate-limit window has passed"""
+        try:
+            wait = float(retry_after)
+        except (TypeError, ValueError):
+            wait = RATE_LIMIT_BACKOFF
+        self._resume_at = max(self._resume_at, time.monotonic() + wait)
+        logger.warning(f"Rate limited by Polygon, pausing requests for {wait:.0f}s")
+
+    async def _probe(self, session: aiohttp.ClientSession, ticker: str, kind: str,
+                     url: str, ttl: float) -> tuple:
+        """(status, JSON body) of a Polygon GET, served from the probe cache while fresh"""
+        cached = self.probe_cache.get(ticker, kind, ttl)
+        if cached is not None:
+            return cached
+
+        async with self._sem:
+            # Honour the most recent rate-limit window before dispatching
+            delay = self._resume_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            async with session.get(url, params={'apikey': self.polygon_api_key}) as response:
+                status = response.status
+                body = await response.json() if status < 400 else None
+                if status == 429:
+                    self._pause_for_rate_limit(response.headers.get('Retry-After'))
+
+        if 200 <= status < 300 or status == 404:
+            self.probe_cache.put(ticker, kind, status, body)
+        return status, body
 
     async def _analyze_single_ticker(self, session: aiohttp.ClientSession, ticker: str) -> tuple:
         """Analyze a single ticker failure"""
         try:
             # Test if ticker exists
             url = f"https://api.polygon.io/v3/reference/tickers/{ticker}"
-            params = {'apikey': self.polygon_api_key}
-
-            async with session.get(url, params=params) as response:
-                if response.status == 404:
-                    return 'TICKER_NOT_FOUND', f"Ticker {ticker} not found in Polygon API"
-                elif response.status == 429:
-                    return 'RATE_LIMIT', "Rate limit exceeded during analysis"
-                elif response.status >= 400:
-                    return 'API_ERROR', f"API error {response.status}"
-
-                data = await response.json()
-
-                # Check if delisted
-                if 'results' in data:
-                    ticker_info = data['results']
-                    if ticker_info.get('delisted_utc'):
-                        return 'DELISTED', f"Stock delisted on {ticker_info['delisted_utc']}"
-
-                    # Check market status
-                    if ticker_info.get('market') != 'stocks':
-                        return 'TICKER_NOT_FOUND', f"Not a stock ticker (market: {ticker_info.get('market')})"
-
-                # Test historical data availability
-                test_date = "2025-08-15"  # Mid-period test
-                agg_url = f"https://api.polygon.io/v2/aggs/ticker/{ticker}/range/1/day/{test_date}/{test_date}"
-
-                async with session.get(agg_url, params=params) as agg_response:
-                    if agg_response.status == 404:
-                        return 'NO_DATA', f"No historical data available for {test_date}"
-                    elif agg_response.status == 429:
-                        return 'RATE_LIMIT', "Rate limit exceeded during data test"
-                    elif agg_response.status >= 400:
-                        return 'API_ERROR', f"Data API error {agg_response.status}"
-
-                    agg_data = await agg_response.json()
-                    if not agg_data.get('results') or len(agg_data['results']) == 0:
-                        return 'INSUFFICIENT_HISTORY', f"No OHLCV data for test date {test_date}"
-
-                # If we get here, it's likely a collection issue
-                return 'UNKNOWN', "Ticker appears valid but collection failed"
+            status, data = await self._probe(session, ticker, 'reference', url, REFERENCE_TTL)
+            failure = _classify_status(status, REFERENCE_STATUS_MAP, "API error {status}", ticker=ticker)
+            if failure:
+                return failure
+
+            # Check if delisted
+            if 'results' in data:
+                ticker_info = data['results']
+                if ticker_info.get('delisted_utc'):
+                    return 'DELISTED', f"Stock delisted on {ticker_info['delisted_utc']}"
+
+                # Check market status
+                if ticker_info.get('market') != 'stocks':
+                    return 'TICKER_NOT_FOUND', f"Not a stock ticker (market: {ticker_info.get('market')})"
+
+            # Test historical data availability
+            test_date = "2025-08-15"  # Mid-period test
+            agg_url = f"https://api.polygon.io/v2/aggs/ticker/{ticker}/range/1/day/{test_date}/{test_date}"
+            agg_status, agg_data = await self._probe(session, ticker, 'aggregate', agg_url, AGGREGATE_TTL)
+            failure = _classify_status(agg_status, AGGREGATE_STATUS_MAP, "Data API error {status}",
+                                       test_date=test_date)
+            if failure:
+                return failure
+
+            if not agg_data.get('results') or len(agg_data['results']) == 0:
+                return 'INSUFFICIENT_HISTORY', f"No OHLCV data for test date {test_date}"
+
+            # If we get here, it's likely a collection issue
+            return 'UNKNOWN', "Ticker appears valid but collection failed"
 
         except asyncio.TimeoutError:
             return 'TIMEOUT', "Request timeout during analysis"
@@ -245,24 +475,33 @@ class PolygonFailureAnalyzer:
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-        # 1. Executive Summary Report
-        await self._generate_executive_summary(failure_analysis, collection_summary,
-                                             filtered_tickers, timestamp)
+        # Rank the top categories once; the summary shows five and the plan takes three
+        ranked_categories = heapq.nlargest(5, failure_analysis['category_percentages'].items(),
+                                           key=lambda x: x[1])
 
-        # 2. Detailed Category Reports
-        await self._generate_category_reports(failure_analysis, timestamp)
+        async def category_reports_and_plan():
+            # 2. Detailed Category Reports (the same pass collects the plan's per-category actions)
+            category_actions = await self._generate_category_reports(failure_analysis, timestamp)
 
-        # 3. Actionable Recommendations
-        await self._generate_remediation_plan(failure_analysis, timestamp)
+            # 3. Actionable Recommendations
+            await self._generate_remediation_plan(ranked_categories, category_actions, timestamp)
 
-        # 4. Ticker-by-Ticker Details
-        await self._generate_detailed_ticker_report(failure_analysis, timestamp)
+        # The reports only read failure_analysis, so they are encoded and written concurrently
+        await asyncio.gather(
+            # 1. Executive Summary Report
+            self._generate_executive_summary(failure_analysis, collection_summary,
+                                             filtered_tickers, ranked_categories, timestamp),
+            category_reports_and_plan(),
+            # 4. Ticker-by-Ticker Details
+            self._generate_detailed_ticker_report(failure_analysis, timestamp)
+        )
 
         logger.info(f"All reports generated in {self.error_records_path}")
 
     async def _generate_executive_summary(self, failure_analysis: Dict[str, Any],
                                         collection_summary: Dict[str, Any],
                                         filtered_tickers: Dict[str, Any],
+                                        ranked_categories: List[tuple],
                                         timestamp: str):
         """Generate executive summary report"""
 
@@ -285,9 +524,9 @@ class PolygonFailureAnalyzer:
             },
 
             "success_metrics": {
-                "overall_success_rate": f"{(successful/total_tickers)*100:.1f}%" if total_tickers > 0 else "N/A",
-                "relevant_success_rate": f"{(successful/(total_tickers-filtered))*100:.1f}%" if (total_tickers-filtered) > 0 else "N/A",
-                "failure_rate": f"{(failed/total_tickers)*100:.1f}%" if total_tickers > 0 else "N/A"
+                "overall_success_rate": _format_pct(successful, total_tickers),
+                "relevant_success_rate": _format_pct(successful, total_tickers - filtered),
+                "failure_rate": _format_pct(failed, total_tickers)
             },
 
             "failure_breakdown": {
@@ -295,25 +534,32 @@ class PolygonFailureAnalyzer:
                 "categories": failure_analysis['category_percentages']
             },
 
-            "top_failure_reasons": dict(sorted(failure_analysis['category_percentages'].items(),
-                                             key=lambda x: x[1], reverse=True)[:5]),
+            "top_failure_reasons": dict(ranked_categories[:5]),
 
             "key_insights": self._generate_key_insights(failure_analysis, collection_summary)
         }
 
         report_path = f"{self.error_records_path}/executive_summary_{timestamp}.json"
-        with open(report_path, 'w') as f:
-            json.dump(summary, f, indent=2)
+        await asyncio.to_thread(self._dump, report_path, summary)
 
         logger.info(f"Executive summary saved to {report_path}")
 
-    async def _generate_category_reports(self, failure_analysis: Dict[str, Any], timestamp: str):
-        """Generate detailed reports for each failure category"""
+    async def _generate_category_reports(self, failure_analysis: Dict[str, Any],
+                                         timestamp: str) -> Dict[str, Any]:
+        """Generate detailed reports for each failure category; returns the plan's per-category actions"""
+        category_actions = {}
 
         for category, tickers in failure_analysis['categories'].items():
             if not tickers:
                 continue
 
+            recommendations = self._get_category_recommendations(category)
+            category_actions[category] = {
+                "affected_tickers": len(tickers),
+                "recommended_actions": recommendations,
+                "implementation_steps": self._get_implementation_steps(category)
+            }
+
             category_report = {
                 "category": category,
                 "description": self.failure_categories.get(category, "Unknown category"),
@@ -321,7 +567,7 @@ class PolygonFailureAnalyzer:
                 "percentage_of_failures": failure_analysis['category_percentages'].get(category, 0),
                 "failed_tickers": sorted(tickers),
                 "sample_details": [],
-                "recommended_actions": self._get_category_recommendations(category)
+                "recommended_actions": recommendations
             }
 
             # Add sample ticker details (first 10)
@@ -337,19 +583,20 @@ class PolygonFailureAnalyzer:
             # Save category report
             safe_category = category.lower().replace(' ', '_')
             report_path = f"{self.error_records_path}/category_{safe_category}_{timestamp}.json"
-            with open(report_path, 'w') as f:
-                json.dump(category_report, f, indent=2)
+            await asyncio.to_thread(self._dump, report_path, category_report)
 
         logger.info(f"Category reports generated for {len(failure_analysis['categories'])} categories")
+        return category_actions
 
-    async def _generate_remediation_plan(self, failure_analysis: Dict[str, Any], timestamp: str):
+    async def _generate_remediation_plan(self, ranked_categories: List[tuple],
+                                         category_actions: Dict[str, Any], timestamp: str):
         """Generate actionable remediation plan"""
 
         plan = {
             "remediation_plan": "Polygon.io Collection Failures - Action Plan",
             "generated_at": datetime.now().isoformat(),
             "priority_actions": [],
-            "category_specific_actions": {},
+            "category_specific_actions": category_actions,
             "implementation_timeline": {},
             "success_metrics": {
                 "target_success_rate": "85%",
@@ -359,10 +606,7 @@ class PolygonFailureAnalyzer:
         }
 
         # Priority actions based on failure percentages
-        sorted_categories = sorted(failure_analysis['category_percentages'].items(),
-                                 key=lambda x: x[1], reverse=True)
-
-        for category, percentage in sorted_categories[:3]:  # Top 3 categories
+        for category, percentage in ranked_categories[:3]:  # Top 3 categories
             if percentage > 5:  # Only significant categories
                 plan['priority_actions'].append({
                     "category": category,
@@ -371,39 +615,23 @@ class PolygonFailureAnalyzer:
                     "timeline": self._get_action_timeline(category)
                 })
 
-        # Detailed actions per category
-        for category, tickers in failure_analysis['categories'].items():
-            if tickers:
-                plan['category_specific_actions'][category] = {
-                    "affected_tickers": len(tickers),
-                    "recommended_actions": self._get_category_recommendations(category),
-                    "implementation_steps": self._get_implementation_steps(category)
-                }
-
         report_path = f"{self.error_records_path}/remediation_plan_{timestamp}.json"
-        with open(report_path, 'w') as f:
-            json.dump(plan, f, indent=2)
+        await asyncio.to_thread(self._dump, report_path, plan)
 
         logger.info(f"Remediation plan saved to {report_path}")
 
     async def _generate_detailed_ticker_report(self, failure_analysis: Dict[str, Any], timestamp: str):
         """Generate detailed ticker-by-ticker failure report"""
 
-        detailed_report = {
+        ticker_details = failure_analysis['ticker_details']
+        header = {
             "report_type": "Detailed Ticker Failure Analysis",
             "generated_at": datetime.now().isoformat(),
-            "total_failed_tickers": len(failure_analysis['ticker_details']),
-            "ticker_failures": failure_analysis['ticker_details']
+            "total_failed_tickers": len(ticker_details)
         }
 
-        # Sort by category for easier review
-        sorted_details = dict(sorted(failure_analysis['ticker_details'].items(),
-                                   key=lambda x: x[1]['category']))
-        detailed_report['ticker_failures'] = sorted_details
-
         report_path = f"{self.error_records_path}/detailed_ticker_failures_{timestamp}.json"
-        with open(report_path, 'w') as f:
-            json.dump(detailed_report, f, indent=2)
+        await asyncio.to_thread(self._stream_detailed_report, report_path, header, ticker_details)
 
         logger.info(f"Detailed ticker report saved to {report_path}")
 
@@ -445,115 +673,19 @@ class PolygonFailureAnalyzer:
 
     def _get_category_recommendations(self, category: str) -> List[str]:
         """Get recommendations for specific failure category"""
-        recommendations = {
-            'NO_DATA': [
-                "Verify ticker symbols are correct and active",
-                "Check if data is available for the requested date range",
-                "Consider alternative data sources for missing tickers"
-            ],
-            'API_ERROR': [
-                "Review API key permissions and quotas",
-                "Implement exponential backoff for retries",
-                "Monitor API status and service announcements"
-            ],
-            'RATE_LIMIT': [
-                "Implement request throttling (max 5 requests/minute for free tier)",
-                "Consider upgrading to higher tier API plan",
-                "Add delays between batch requests"
-            ],
-            'TICKER_NOT_FOUND': [
-                "Validate ticker symbols against current market listings",
-                "Update ticker list to remove invalid symbols",
-                "Cross-reference with multiple data sources"
-            ],
-            'DELISTED': [
-                "Filter out delisted stocks from collection list",
-                "Implement delisting date checks",
-                "Update ticker universe regularly"
-            ],
-            'INSUFFICIENT_HISTORY': [
-                "Adjust historical lookback period requirements",
-                "Handle newly listed stocks separately",
-                "Consider shorter history for recent IPOs"
-            ],
-            'DATA_QUALITY': [
-                "Implement data validation checks",
-                "Handle missing OHLCV data gracefully",
-                "Flag incomplete data for manual review"
-            ],
-            'NETWORK_ERROR': [
-                "Implement retry logic for transient failures",
-                "Add connection timeout handling",
-                "Monitor network connectivity"
-            ],
-            'TIMEOUT': [
-                "Increase request timeout values",
-                "Implement asynchronous processing",
-                "Break large requests into smaller batches"
-            ],
-            'UNKNOWN': [
-                "Enable detailed error logging",
-                "Implement comprehensive exception handling",
-                "Review API documentation for edge cases"
-            ]
-        }
-        return recommendations.get(category, ["Review and investigate manually"])
+        return CATEGORY_RECOMMENDATIONS.get(category, ["Review and investigate manually"])
 
     def _get_priority_action(self, category: str) -> str:
         """Get priority action for category"""
-        actions = {
-            'NO_DATA': "Update ticker validation process",
-            'API_ERROR': "Review API configuration and error handling",
-            'RATE_LIMIT': "Implement proper request throttling",
-            'TICKER_NOT_FOUND': "Clean up ticker list",
-            'DELISTED': "Filter delisted stocks",
-            'INSUFFICIENT_HISTORY': "Adjust history requirements",
-            'DATA_QUALITY': "Enhance data validation",
-            'NETWORK_ERROR': "Improve error handling",
-            'TIMEOUT': "Optimize request timing",
-            'UNKNOWN': "Enhance error logging"
-        }
-        return actions.get(category, "Investigate and resolve")
+        return PRIORITY_ACTIONS.get(category, "Investigate and resolve")
 
     def _get_action_timeline(self, category: str) -> str:
         """Get implementation timeline for category"""
-        timelines = {
-            'NO_DATA': "1 week",
-            'API_ERROR': "3 days",
-            'RATE_LIMIT': "1 day",
-            'TICKER_NOT_FOUND': "2 days",
-            'DELISTED': "1 day",
-            'INSUFFICIENT_HISTORY': "2 days",
-            'DATA_QUALITY': "1 week",
-            'NETWORK_ERROR': "3 days",
-            'TIMEOUT': "1 day",
-            'UNKNOWN': "1 week"
-        }
-        return timelines.get(category, "1 week")
+        return ACTION_TIMELINES.get(category, "1 week")
 
     def _get_implementation_steps(self, category: str) -> List[str]:
         """Get implementation steps for category"""
-        steps = {
-            'RATE_LIMIT': [
-                "1. Add request delay configuration",
-                "2. Implement rate limiting decorator",
-                "3. Test with smaller batches",
-                "4. Monitor success rate improvement"
-            ],
-            'TICKER_NOT_FOUND': [
-                "1. Export failed ticker list",
-                "2. Cross-reference with current market data",
-                "3. Remove invalid tickers from input data",
-                "4. Re-run collection for remaining tickers"
-            ],
-            'DELISTED': [
-                "1. Query delisting dates from API",
-                "2. Add delisting filter to collection logic",
-                "3. Update ticker universe monthly",
-                "4. Document delisted tickers for reference"
-            ]
-        }
-        return steps.get(category, ["1. Analyze root cause", "2. Implement fix", "3. Test solution"])
+        return IMPLEMENTATION_STEPS.get(category, ["1. Analyze root cause", "2. Implement fix", "3. Test solution"])
 
 
 async def main():
@@ -8,20 +8,100 @@ investigation reports, and actionable remediation plans.
 
 import os
 import json
+import random
 import asyncio
-import aiohttp
-from datetime import datetime, timedelta
+import functools
+import orjson
+import numpy as np
+from datetime import datetime
 from collections import defaultdict, Counter
-from typing import Dict, List, Any, Optional, Set
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Iterable, Optional, Set, TYPE_CHECKING
 import logging
 import argparse
+import sys
 from pathlib import Path
-import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from _dir_scan import count_json_files
+
+if TYPE_CHECKING:
+    import aiohttp
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+@functools.lru_cache(maxsize=4096)
+def _read_json_cached(file_path: str, mtime_ns: int) -> Any:
+    """Parsed JSON of file_path; mtime_ns is part of the key so a rewritten file is re-read.
+
+    Callers share the returned object and must not mutate it.
+    """
+    with open(file_path, 'rb') as f:
+        return orjson.loads(f.read())
+
+
+# Failure category -> (remediation bucket, action, reason template, implementation)
+# for categories above 10% of failures
+REMEDIATION_TEMPLATES = {
+    'FILTERED_MARKET_CAP': ('immediate_actions', 'Update ticker filtering logic',
+                            "{pct:.1f}% of failures due to market cap filtering",
+                            'Review and update market cap thresholds'),
+    'NO_DATA_COLLECTED': ('immediate_actions', 'Investigate collection pipeline failures',
+                          "{pct:.1f}% complete collection failures",
+                          'Review logs and retry failed collections'),
+    'PARTIAL_COLLECTION': ('short_term_improvements', 'Implement data completeness validation',
+                           "{pct:.1f}% partial collections detected",
+                           'Add post-collection validation and retry logic')
+}
+
+# Failure categories already explained by local data; the Polygon API check adds nothing for them
+API_SKIP_CATEGORIES = frozenset({'TICKER_NOT_IN_INPUT', 'FILTERED_MARKET_CAP'})
+
+# Category name -> filename fragment, e.g. NO_DATA_COLLECTED -> no-data-collected
+CATEGORY_FILENAME_TRANS = str.maketrans('_', '-')
+
+
+def _json_default(obj: Any) -> Any:
+    """orjson fallback: ticker sets are written as lists, anything else as its string form"""
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return str(obj)
+
+
+@functools.lru_cache(maxsize=None)
+def _nyse_trading_day():
+    """CustomBusinessDay skipping full-day NYSE closures: the federal holidays the exchange
+    observes, plus Good Friday.
+
+    pandas is imported here rather than at module level so runs that never need the
+    trading calendar don't pay its import cost.
+    """
+    from pandas.tseries.holiday import (AbstractHolidayCalendar, Holiday, GoodFriday, USLaborDay,
+                                        USMartinLutherKingJr, USMemorialDay, USPresidentsDay,
+                                        USThanksgivingDay, nearest_workday, sunday_to_monday)
+    from pandas.tseries.offsets import CustomBusinessDay
+
+    class NYSEHolidayCalendar(AbstractHolidayCalendar):
+        rules = [
+            Holiday('New Years Day', month=1, day=1, observance=sunday_to_monday),
+            USMartinLutherKingJr,
+            USPresidentsDay,
+            GoodFriday,
+            USMemorialDay,
+            Holiday('Juneteenth', month=6, day=19, start_date='2022-06-19', observance=nearest_workday),
+            Holiday('Independence Day', month=7, day=4, observance=nearest_workday),
+            USLaborDay,
+            USThanksgivingDay,
+            Holiday('Christmas', month=12, day=25, observance=nearest_workday)
+        ]
+
+    return CustomBusinessDay(calendar=NYSEHolidayCalendar())
+
+
 class EnhancedFailureAnalyzer:
     def __init__(self, polygon_api_key: str = None):
         self.polygon_api_key = polygon_api_key or os.getenv('POLYGON_API_KEY')
@@ -46,6 +126,9 @@ class EnhancedFailureAnalyzer:
             'UNKNOWN_ERROR': 'Unclassified error requiring investigation'
         }
 
+        self._session: Optional['aiohttp.ClientSession'] = None
+        self._trading_dates_cache: Dict[tuple, List[str]] = {}
+
         # Create directories
         os.makedirs(self.error_records_path, exist_ok=True)
         os.makedirs(f"{self.error_records_path}/reports", exist_ok=True)
@@ -55,19 +138,37 @@ class EnhancedFailureAnalyzer:
         """Run comprehensive failure analysis"""
         logger.info(f"Starting comprehensive failure analysis for {start_date} to {end_date}")
 
-        # Step 1: Load all relevant data
-        collection_data = await self._load_all_collection_data()
+        try:
+            # Step 1: Load all relevant data
+            collection_data = await self._load_all_collection_data()
 
-        # Step 2: Identify actual vs expected failures
-        failure_analysis = await self._analyze_collection_discrepancies(collection_data, start_date, end_date)
+            # Step 2: Identify actual vs expected failures
+            failure_analysis = await self._analyze_collection_discrepancies(collection_data, start_date, end_date)
 
-        # Step 3: Investigate specific failures
-        investigated_failures = await self._investigate_failures(failure_analysis)
+            # Step 3: Investigate specific failures
+            investigated_failures = await self._investigate_failures(failure_analysis)
 
-        # Step 4: Generate comprehensive reports
-        await self._generate_comprehensive_reports(investigated_failures, collection_data)
+            # Step 4: Generate comprehensive reports
+            await self._generate_comprehensive_reports(investigated_failures, collection_data)
 
-        return investigated_failures
+            return investigated_failures
+        finally:
+            await self.aclose()
+
+    async def _get_session(self) -> 'aiohttp.ClientSession':
+        """Shared API session, created on first use so runs without API checks never open one"""
+        if self._session is None or self._session.closed:
+            import aiohttp
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=64, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=10))
+        return self._session
+
+    async def aclose(self):
+        """Close the shared API session, if one was opened"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
 
     async def _load_all_collection_data(self) -> Dict[str, Any]:
         """Load all relevant collection data sources"""
@@ -77,9 +178,11 @@ class EnhancedFailureAnalyzer:
             'polygon_summary': self._load_json_safe(f"{self.base_path}/collection_summary.json"),
             'filtered_tickers': self._load_json_safe(f"{self.base_path}/filtered_tickers.json"),
             'yfinance_input': self._load_latest_yfinance_data(),
-            'polygon_collected': self._scan_collected_polygon_data(),
             'expected_dates': self._get_expected_trading_dates("2025-06-01", "2025-09-01")
         }
+        data['polygon_collected'], data['polygon_uncollected_dirs'] = self._scan_collected_polygon_data()
+        # Input records by ticker, built once for the discrepancy and per-failure lookups
+        data['input_by_ticker'] = {item['ticker']: item for item in data['yfinance_input']}
 
         logger.info(f"Loaded data: {len(data['yfinance_input'])} input tickers, "
                    f"{len(data['polygon_collected'])} collected tickers")
@@ -89,92 +192,126 @@ class EnhancedFailureAnalyzer:
     def _load_json_safe(self, file_path: str) -> Dict[str, Any]:
         """Safely load JSON file"""
         try:
-            with open(file_path, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
+            return _read_json_cached(file_path, os.stat(file_path).st_mtime_ns)
+        except (FileNotFoundError, orjson.JSONDecodeError) as e:
             logger.warning(f"Could not load {file_path}: {e}")
             return {}
 
+    @staticmethod
+    def _write_json(file_path: str, obj: Any):
+        """Write obj as indented JSON"""
+        with open(file_path, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+                                 default=_json_default))
+
+    @staticmethod
+    def _write_jsonl(file_path: str, records: List[Any]):
+        """Write records as JSON Lines, encoding one record at a time"""
+        with open(file_path, 'wb') as f:
+            for record in records:
+                f.write(orjson.dumps(record, default=_json_default, option=orjson.OPT_APPEND_NEWLINE))
+
     def _load_latest_yfinance_data(self) -> List[Dict[str, Any]]:
         """Load latest YFinance enriched data"""
         input_source_path = "/workspaces/data/input_source"
         try:
-            yfinance_files = [f for f in os.listdir(input_source_path)
-                            if f.startswith("enriched_yfinance_")]
-            if not yfinance_files:
+            latest_file = max((f for f in os.listdir(input_source_path)
+                               if f.startswith("enriched_yfinance_")), default=None)
+            if latest_file is None:
                 return []
 
-            latest_file = sorted(yfinance_files)[-1]
+            # stdlib json on purpose: collect_us_market_stocks.py writes this file with json.dump,
+            # so it can hold NaN/Infinity from raw yfinance info, which orjson rejects
             with open(f"{input_source_path}/{latest_file}", 'r') as f:
                 data = json.load(f)
-                return data if isinstance(data, list) else []
+            return data if isinstance(data, list) else []
         except Exception as e:
             logger.warning(f"Could not load YFinance data: {e}")
             return []
 
-    def _scan_collected_polygon_data(self) -> Dict[str, Dict[str, Any]]:
-        """Scan collected Polygon data for analysis"""
+    def _scan_collected_polygon_data(self) -> tuple:
+        """Scan collected Polygon data for analysis.
+
+        Returns (collected data by ticker, JSON file count of every ticker directory without
+        2025 data); the second lets failure classification skip its own directory walks.
+        """
         collected_data = {}
+        uncollected_dirs = {}
 
         if not os.path.exists(self.base_path):
-            return collected_data
-
-        for ticker_dir in os.listdir(self.base_path):
-            ticker_path = os.path.join(self.base_path, ticker_dir)
-            if not os.path.isdir(ticker_path) or ticker_dir.startswith('.'):
-                continue
-
-            ticker_info = {
-                'ticker': ticker_dir,
-                'total_files': 0,
-                'date_range': [],
-                'months_covered': set(),
-                'sample_file': None
-            }
+            return collected_data, uncollected_dirs
+
+        with os.scandir(self.base_path) as ticker_entries:
+            ticker_paths = [entry.path for entry in ticker_entries
+                            if not entry.name.startswith('.') and entry.is_dir()]
+
+        # Ticker directories are independent and the walk is all filesystem waits, so
+        # overlap them on threads; map() keeps the listing order for the results
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            for ticker_path, ticker_info in zip(ticker_paths, executor.map(self._scan_ticker_dir, ticker_paths)):
+                if isinstance(ticker_info, dict):
+                    collected_data[ticker_info['ticker']] = ticker_info
+                else:
+                    uncollected_dirs[os.path.basename(ticker_path)] = ticker_info
+
+        return collected_data, uncollected_dirs
+
+    @classmethod
+    def _scan_ticker_dir(cls, ticker_path: str):
+        """Collected data for one ticker directory, or its JSON file count if it has no 2025 data"""
+        ticker_info = cls._scan_one_ticker(ticker_path)
+        return ticker_info if ticker_info is not None else count_json_files(ticker_path)
+
+    @staticmethod
+    def _scan_one_ticker(ticker_path: str) -> Optional[Dict[str, Any]]:
+        """Files, dates and months collected for one ticker directory, or None if it has no data"""
+        ticker_info = {
+            'ticker': os.path.basename(ticker_path),
+            'total_files': 0,
+            'date_range': [],
+            'months_covered': set(),
+            'sample_file': None
+        }
 
-            # Scan ticker directory
-            year_path = os.path.join(ticker_path, "2025")
-            if os.path.exists(year_path):
-                for month_dir in os.listdir(year_path):
-                    month_path = os.path.join(year_path, month_dir)
-                    if os.path.isdir(month_path):
-                        ticker_info['months_covered'].add(month_dir)
+        # Scan ticker directory
+        try:
+            month_entries = list(os.scandir(os.path.join(ticker_path, "2025")))
+        except (FileNotFoundError, NotADirectoryError):
+            month_entries = []
 
-                        files = [f for f in os.listdir(month_path) if f.endswith('.json')]
-                        ticker_info['total_files'] += len(files)
+        for month_entry in month_entries:
+            if not month_entry.is_dir():
+                continue
+            ticker_info['months_covered'].add(month_entry.name)
 
-                        if files:
-                            dates = [f.replace('.json', '') for f in files]
-                            ticker_info['date_range'].extend(dates)
+            with os.scandir(month_entry.path) as file_entries:
+                for file_entry in file_entries:
+                    if not file_entry.name.endswith('.json'):
+                        continue
+                    ticker_info['total_files'] += 1
+                    ticker_info['date_range'].append(file_entry.name[:-5])
 
-                            # Get sample file for analysis
-                            if not ticker_info['sample_file']:
-                                ticker_info['sample_file'] = os.path.join(month_path, files[0])
+                    # Get sample file for analysis
+                    if not ticker_info['sample_file']:
+                        ticker_info['sample_file'] = file_entry.path
 
-            if ticker_info['total_files'] > 0:
-                ticker_info['date_range'] = sorted(ticker_info['date_range'])
-                ticker_info['months_covered'] = sorted(list(ticker_info['months_covered']))
-                collected_data[ticker_dir] = ticker_info
+        if ticker_info['total_files'] == 0:
+            return None
 
-        return collected_data
+        # Kept as a sorted string array: the coverage check concatenates these without
+        # converting each ticker's list again
+        ticker_info['date_range'] = np.sort(np.array(ticker_info['date_range'], dtype=str))
+        ticker_info['months_covered'] = sorted(ticker_info['months_covered'])
+        return ticker_info
 
     def _get_expected_trading_dates(self, start_date: str, end_date: str) -> List[str]:
-        """Get expected trading dates (excluding weekends)"""
-        from datetime import datetime, timedelta
-
-        start = datetime.strptime(start_date, "%Y-%m-%d")
-        end = datetime.strptime(end_date, "%Y-%m-%d")
-
-        trading_dates = []
-        current = start
-
-        while current <= end:
-            # Exclude weekends (Saturday=5, Sunday=6)
-            if current.weekday() < 5:
-                trading_dates.append(current.strftime("%Y-%m-%d"))
-            current += timedelta(days=1)
-
-        return trading_dates
+        """Get expected trading dates (excluding weekends and NYSE holidays)"""
+        key = (start_date, end_date)
+        if key not in self._trading_dates_cache:
+            import pandas as pd
+            self._trading_dates_cache[key] = pd.bdate_range(
+                start_date, end_date, freq=_nyse_trading_day()).strftime("%Y-%m-%d").tolist()
+        return self._trading_dates_cache[key]
 
     async def _analyze_collection_discrepancies(self, collection_data: Dict[str, Any],
                                               start_date: str, end_date: str) -> Dict[str, Any]:
@@ -182,7 +319,7 @@ class EnhancedFailureAnalyzer:
         logger.info("Analyzing collection discrepancies...")
 
         # Get sets for analysis
-        input_tickers = {item['ticker'] for item in collection_data['yfinance_input']}
+        input_tickers = collection_data['input_by_ticker'].keys()
         collected_tickers = set(collection_data['polygon_collected'].keys())
         filtered_tickers = set(collection_data['filtered_tickers'].get('filtered_tickers', []))
 
@@ -200,22 +337,44 @@ class EnhancedFailureAnalyzer:
                 'collection_rate': (len(collected_tickers) / len(input_tickers)) * 100 if input_tickers else 0
             },
             'discrepancies': {
-                'missing_from_collection': list(input_tickers - collected_tickers - filtered_tickers),
-                'unexpected_collections': list(collected_tickers - input_tickers),
-                'filtered_but_collected': list(collected_tickers & filtered_tickers)
+                'missing_from_collection': input_tickers - collected_tickers - filtered_tickers,
+                'unexpected_collections': collected_tickers - input_tickers,
+                'filtered_but_collected': collected_tickers & filtered_tickers
             },
             'quality_metrics': await self._analyze_collection_quality(collection_data),
             'detailed_failures': {}
         }
 
-        # Analyze missing tickers in detail
-        for ticker in analysis['discrepancies']['missing_from_collection']:
-            analysis['detailed_failures'][ticker] = await self._analyze_individual_failure(
-                ticker, collection_data)
+        # Classify missing tickers locally, then check the ambiguous ones with the API
+        analysis['detailed_failures'] = {
+            ticker: self._analyze_individual_failure(ticker, collection_data)
+            for ticker in analysis['discrepancies']['missing_from_collection']
+        }
+        if self.polygon_api_key:
+            await self._add_api_checks(analysis['detailed_failures'].values())
 
         logger.info(f"Analysis complete: {len(analysis['detailed_failures'])} failures identified")
         return analysis
 
+    async def _add_api_checks(self, failures: Iterable[Dict[str, Any]]):
+        """Append a Polygon API check note to every failure the API can tell us more about.
+
+        Runs concurrently but with at most 20 requests in flight so the checks stay within
+        Polygon's rate limits; categories in API_SKIP_CATEGORIES are never sent.
+        """
+        sem = asyncio.Semaphore(20)
+        await asyncio.gather(*(self._api_check_one(failure_info, sem) for failure_info in failures
+                               if failure_info['category'] not in API_SKIP_CATEGORIES))
+
+    async def _api_check_one(self, failure_info: Dict[str, Any], sem: asyncio.Semaphore):
+        """API check for one failure, holding sem while the request is made"""
+        async with sem:
+            try:
+                api_info = await self._check_ticker_with_api(failure_info['ticker'])
+                failure_info['investigation_notes'].append(f"API check: {api_info}")
+            except Exception as e:
+                failure_info['investigation_notes'].append(f"API check failed: {e}")
+
     async def _analyze_collection_quality(self, collection_data: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze quality of collected data"""
         quality_metrics = {
@@ -237,16 +396,17 @@ class EnhancedFailureAnalyzer:
         quality_metrics['total_files_collected'] = total_files
         quality_metrics['average_files_per_ticker'] = total_files / len(collected_data)
 
-        # Analyze date coverage
-        all_collected_dates = set()
-        for ticker_info in collected_data.values():
-            all_collected_dates.update(ticker_info['date_range'])
+        # Analyze date coverage (sort/unique/diff over string arrays rather than hashing every date)
+        all_collected_dates = np.unique(np.concatenate(
+            [ticker_info['date_range'] for ticker_info in collected_data.values()]))
+        missing_dates = np.setdiff1d(np.array(expected_dates, dtype=str), all_collected_dates,
+                                     assume_unique=True)
 
         quality_metrics['date_coverage'] = {
             'expected_trading_days': len(expected_dates),
             'actual_trading_days_covered': len(all_collected_dates),
             'coverage_percentage': (len(all_collected_dates) / len(expected_dates)) * 100 if expected_dates else 0,
-            'missing_dates': list(set(expected_dates) - all_collected_dates)
+            'missing_dates': missing_dates.tolist()
         }
 
         # Sample data quality check
@@ -258,8 +418,8 @@ class EnhancedFailureAnalyzer:
             ticker_info = collected_data[ticker]
             if ticker_info['sample_file'] and os.path.exists(ticker_info['sample_file']):
                 try:
-                    with open(ticker_info['sample_file'], 'r') as f:
-                        data = json.load(f)
+                    sample_file = ticker_info['sample_file']
+                    data = _read_json_cached(sample_file, os.stat(sample_file).st_mtime_ns)
 
                     total_sampled += 1
                     required_sections = ['basic_data', 'technical_indicators', 'fundamental_data']
@@ -277,8 +437,8 @@ class EnhancedFailureAnalyzer:
 
         return quality_metrics
 
-    async def _analyze_individual_failure(self, ticker: str, collection_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze individual ticker failure"""
+    def _analyze_individual_failure(self, ticker: str, collection_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Classify an individual ticker failure from local data (API checks are added separately)"""
         failure_info = {
             'ticker': ticker,
             'analysis_timestamp': datetime.now().isoformat(),
@@ -289,7 +449,7 @@ class EnhancedFailureAnalyzer:
         }
 
         # Check if ticker was in input data
-        input_tickers = {item['ticker']: item for item in collection_data['yfinance_input']}
+        input_tickers = collection_data['input_by_ticker']
         if ticker not in input_tickers:
             failure_info['category'] = 'TICKER_NOT_IN_INPUT'
             failure_info['detailed_reason'] = 'Ticker not found in YFinance input data'
@@ -306,64 +466,74 @@ class EnhancedFailureAnalyzer:
             failure_info['remediation_priority'] = 'Low'
             return failure_info
 
-        # Check if any partial data exists
-        ticker_path = os.path.join(self.base_path, ticker)
-        if os.path.exists(ticker_path):
+        # Check if any partial data exists, using the directory scan from data loading
+        # (missing tickers never have 2025 data, so their directories are all in uncollected_dirs)
+        file_count = collection_data['polygon_uncollected_dirs'].get(ticker)
+        if file_count is not None:
             failure_info['category'] = 'PARTIAL_COLLECTION'
             failure_info['detailed_reason'] = 'Partial data collected - investigating completeness'
             failure_info['remediation_priority'] = 'High'
 
-            # Count files
-            file_count = 0
-            for root, dirs, files in os.walk(ticker_path):
-                file_count += len([f for f in files if f.endswith('.json')])
-
+            ticker_path = os.path.join(self.base_path, ticker)
             failure_info['investigation_notes'].append(f"Found {file_count} files in {ticker_path}")
         else:
             failure_info['category'] = 'NO_DATA_COLLECTED'
             failure_info['detailed_reason'] = 'No data directory found - complete collection failure'
             failure_info['remediation_priority'] = 'High'
 
-        # Additional checks with API if available
-        if self.polygon_api_key:
-            try:
-                api_info = await self._check_ticker_with_api(ticker)
-                failure_info['investigation_notes'].append(f"API check: {api_info}")
-            except Exception as e:
-                failure_info['investigation_notes'].append(f"API check failed: {e}")
-
         return failure_info
 
+    async def _request_with_retry(self, url: str, params: Dict[str, str],
+                                  attempts: int = 4) -> tuple:
+        """(status, JSON body) of a GET, retrying rate limits and server errors.
+
+        429s wait for the Retry-After header when it gives seconds, otherwise 2**attempt;
+        5xx responses back off 2**attempt plus jitter. Any other status returns at once,
+        and the body is only read for a 200.
+        """
+        session = await self._get_session()
+        for attempt in range(attempts):
+            async with session.get(url, params=params) as response:
+                status = response.status
+                if status == 200:
+                    return status, await response.json()
+                if (status != 429 and status < 500) or attempt == attempts - 1:
+                    return status, None
+                retry_after = response.headers.get('Retry-After', '')
+
+            if status == 429 and retry_after.isdigit():
+                wait = int(retry_after)
+            else:
+                wait = 2 ** attempt + (random.random() if status >= 500 else 0)
+            await asyncio.sleep(wait)
+
     async def _check_ticker_with_api(self, ticker: str) -> str:
         """Check ticker status with Polygon API"""
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"https://api.polygon.io/v3/reference/tickers/{ticker}"
-                params = {'apikey': self.polygon_api_key}
-
-                async with session.get(url, params=params, timeout=10) as response:
-                    if response.status == 404:
-                        return "Ticker not found in Polygon API"
-                    elif response.status == 429:
-                        return "Rate limited during API check"
-                    elif response.status != 200:
-                        return f"API error: {response.status}"
-
-                    data = await response.json()
-                    if 'results' in data:
-                        ticker_info = data['results']
-                        status_info = []
-
-                        if ticker_info.get('delisted_utc'):
-                            status_info.append(f"Delisted: {ticker_info['delisted_utc']}")
-                        if ticker_info.get('market'):
-                            status_info.append(f"Market: {ticker_info['market']}")
-                        if ticker_info.get('active') is not None:
-                            status_info.append(f"Active: {ticker_info['active']}")
-
-                        return "; ".join(status_info) if status_info else "Ticker appears valid"
-
-                    return "Ticker found but no details available"
+            url = f"https://api.polygon.io/v3/reference/tickers/{ticker}"
+            status, data = await self._request_with_retry(url, {'apikey': self.polygon_api_key})
+
+            if status == 404:
+                return "Ticker not found in Polygon API"
+            elif status == 429:
+                return "Rate limited during API check"
+            elif status != 200:
+                return f"API error: {status}"
+
+            if 'results' in data:
+                ticker_info = data['results']
+                status_info = []
+
+                if ticker_info.get('delisted_utc'):
+                    status_info.append(f"Delisted: {ticker_info['delisted_utc']}")
+                if ticker_info.get('market'):
+                    status_info.append(f"Market: {ticker_info['market']}")
+                if ticker_info.get('active') is not None:
+                    status_info.append(f"Active: {ticker_info['active']}")
+
+                return "; ".join(status_info) if status_info else "Ticker appears valid"
+
+            return "Ticker found but no details available"
 
         except asyncio.TimeoutError:
             return "API timeout"
@@ -391,22 +561,25 @@ class EnhancedFailureAnalyzer:
             'raw_analysis': failure_analysis
         }
 
-        # Categorize and prioritize failures
-        for ticker, failure_info in failure_analysis['detailed_failures'].items():
+        # Categorize, count and prioritize failures in one pass
+        category_counts = Counter()
+        priority_breakdown = Counter(investigated['investigation_summary']['priority_breakdown'])
+        for failure_info in failure_analysis['detailed_failures'].values():
             category = failure_info['category']
-            priority = failure_info['remediation_priority']
-
             investigated['failure_categories'][category].append(failure_info)
-            investigated['investigation_summary']['priority_breakdown'][priority] += 1
+            category_counts[category] += 1
+            priority_breakdown[failure_info['remediation_priority']] += 1
+        investigated['investigation_summary']['priority_breakdown'] = dict(priority_breakdown)
 
         # Calculate category percentages
         total_failures = investigated['investigation_summary']['total_failures_investigated']
-        for category, failures in investigated['failure_categories'].items():
-            percentage = (len(failures) / total_failures) * 100 if total_failures > 0 else 0
-            investigated['investigation_summary']['categories_found'][category] = {
-                'count': len(failures),
-                'percentage': percentage
+        investigated['investigation_summary']['categories_found'] = {
+            category: {
+                'count': count,
+                'percentage': (count / total_failures) * 100 if total_failures > 0 else 0
             }
+            for category, count in category_counts.items()
+        }
 
         # Generate remediation recommendations
         investigated['remediation_plan'] = self._generate_remediation_recommendations(investigated)
@@ -430,27 +603,16 @@ class EnhancedFailureAnalyzer:
 
         # Generate recommendations based on failure categories
         for category, info in categories.items():
-            if info['percentage'] > 10:  # Significant categories
-                if category == 'FILTERED_MARKET_CAP':
-                    remediation['immediate_actions'].append({
-                        'action': 'Update ticker filtering logic',
-                        'reason': f"{info['percentage']:.1f}% of failures due to market cap filtering",
-                        'implementation': 'Review and update market cap thresholds'
-                    })
-
-                elif category == 'NO_DATA_COLLECTED':
-                    remediation['immediate_actions'].append({
-                        'action': 'Investigate collection pipeline failures',
-                        'reason': f"{info['percentage']:.1f}% complete collection failures",
-                        'implementation': 'Review logs and retry failed collections'
-                    })
-
-                elif category == 'PARTIAL_COLLECTION':
-                    remediation['short_term_improvements'].append({
-                        'action': 'Implement data completeness validation',
-                        'reason': f"{info['percentage']:.1f}% partial collections detected",
-                        'implementation': 'Add post-collection validation and retry logic'
-                    })
+            template = REMEDIATION_TEMPLATES.get(category)
+            if template is None or info['percentage'] <= 10:  # Only significant, actionable categories
+                continue
+
+            bucket, action, reason, implementation = template
+            remediation[bucket].append({
+                'action': action,
+                'reason': reason.format(pct=info['percentage']),
+                'implementation': implementation
+            })
 
         # Add general improvements
         success_rate = investigated['success_metrics'].get('collection_rate', 0)
@@ -481,30 +643,33 @@ class EnhancedFailureAnalyzer:
         """Generate comprehensive failure reports"""
         logger.info("Generating comprehensive reports...")
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-        # 1. Executive Dashboard
-        await self._create_executive_dashboard(investigated, timestamp)
-
-        # 2. Technical Investigation Report
-        await self._create_technical_report(investigated, timestamp)
-
-        # 3. Category Analysis Reports
-        await self._create_category_reports(investigated, timestamp)
-
-        # 4. Remediation Action Plan
-        await self._create_action_plan(investigated, timestamp)
-
-        # 5. Collection Quality Report
-        await self._create_quality_report(collection_data, investigated, timestamp)
+        # One clock reading for the whole run, so every report agrees on when it was generated
+        now = datetime.now()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
+        generated_at = now.isoformat()
+
+        # The reports only read the analysis results, so they are encoded and written concurrently
+        await asyncio.gather(
+            # 1. Executive Dashboard
+            self._create_executive_dashboard(investigated, timestamp, generated_at),
+            # 2. Technical Investigation Report
+            self._create_technical_report(investigated, timestamp, generated_at),
+            # 3. Category Analysis Reports
+            self._create_category_reports(investigated, timestamp),
+            # 4. Remediation Action Plan
+            self._create_action_plan(investigated, timestamp, generated_at),
+            # 5. Collection Quality Report
+            self._create_quality_report(collection_data, investigated, timestamp, generated_at)
+        )
 
         logger.info(f"All reports generated with timestamp {timestamp}")
 
-    async def _create_executive_dashboard(self, investigated: Dict[str, Any], timestamp: str):
+    async def _create_executive_dashboard(self, investigated: Dict[str, Any], timestamp: str,
+                                          generated_at: str):
         """Create executive dashboard report"""
         dashboard = {
             "report_type": "Executive Dashboard - Polygon.io Collection Analysis",
-            "generated_at": datetime.now().isoformat(),
+            "generated_at": generated_at,
             "period": investigated['raw_analysis']['period'],
 
             "key_metrics": {
@@ -530,16 +695,16 @@ class EnhancedFailureAnalyzer:
         }
 
         report_path = f"{self.error_records_path}/reports/executive_dashboard_{timestamp}.json"
-        with open(report_path, 'w') as f:
-            json.dump(dashboard, f, indent=2)
+        await asyncio.to_thread(self._write_json, report_path, dashboard)
 
         logger.info(f"Executive dashboard saved to {report_path}")
 
-    async def _create_technical_report(self, investigated: Dict[str, Any], timestamp: str):
+    async def _create_technical_report(self, investigated: Dict[str, Any], timestamp: str,
+                                       generated_at: str):
         """Create detailed technical investigation report"""
         technical_report = {
             "report_type": "Technical Investigation Report",
-            "generated_at": datetime.now().isoformat(),
+            "generated_at": generated_at,
             "investigation_details": investigated['investigation_summary'],
             "detailed_failures": investigated['raw_analysis']['detailed_failures'],
             "failure_categories": dict(investigated['failure_categories']),
@@ -548,22 +713,28 @@ class EnhancedFailureAnalyzer:
         }
 
         report_path = f"{self.error_records_path}/investigations/technical_report_{timestamp}.json"
-        with open(report_path, 'w') as f:
-            json.dump(technical_report, f, indent=2)
+        await asyncio.to_thread(self._write_json, report_path, technical_report)
 
         logger.info(f"Technical report saved to {report_path}")
 
     async def _create_category_reports(self, investigated: Dict[str, Any], timestamp: str):
-        """Create individual category analysis reports"""
+        """Create individual category analysis reports.
+
+        Each category gets a small .header.json (metadata and analysis) and a .jsonl with one
+        failure per line, readable with pd.read_json(path, lines=True).
+        """
         for category, failures in investigated['failure_categories'].items():
             if not failures:
                 continue
 
+            safe_category = category.lower().translate(CATEGORY_FILENAME_TRANS)
+            report_base = f"{self.error_records_path}/investigations/category_{safe_category}_{timestamp}"
+
             category_report = {
                 "category": category,
                 "description": self.failure_categories.get(category, "Unknown category"),
                 "total_failures": len(failures),
-                "failures": failures,
+                "failures_file": os.path.basename(f"{report_base}.jsonl"),
                 "analysis": {
                     "common_patterns": self._identify_patterns(failures),
                     "priority_distribution": self._analyze_priorities(failures),
@@ -571,16 +742,15 @@ class EnhancedFailureAnalyzer:
                 }
             }
 
-            safe_category = category.lower().replace('_', '-')
-            report_path = f"{self.error_records_path}/investigations/category_{safe_category}_{timestamp}.json"
-            with open(report_path, 'w') as f:
-                json.dump(category_report, f, indent=2)
+            await asyncio.to_thread(self._write_json, f"{report_base}.header.json", category_report)
+            await asyncio.to_thread(self._write_jsonl, f"{report_base}.jsonl", failures)
 
-    async def _create_action_plan(self, investigated: Dict[str, Any], timestamp: str):
+    async def _create_action_plan(self, investigated: Dict[str, Any], timestamp: str,
+                                  generated_at: str):
         """Create actionable remediation plan"""
         action_plan = {
             "action_plan": "Polygon.io Collection Improvement Plan",
-            "generated_at": datetime.now().isoformat(),
+            "generated_at": generated_at,
             "current_state": {
                 "success_rate": f"{investigated['success_metrics'].get('collection_rate', 0):.1f}%",
                 "failure_count": investigated['investigation_summary']['total_failures_investigated'],
@@ -601,17 +771,16 @@ class EnhancedFailureAnalyzer:
         }
 
         report_path = f"{self.error_records_path}/reports/action_plan_{timestamp}.json"
-        with open(report_path, 'w') as f:
-            json.dump(action_plan, f, indent=2)
+        await asyncio.to_thread(self._write_json, report_path, action_plan)
 
     async def _create_quality_report(self, collection_data: Dict[str, Any],
-                                   investigated: Dict[str, Any], timestamp: str):
+                                   investigated: Dict[str, Any], timestamp: str, generated_at: str):
         """Create data quality assessment report"""
         quality_metrics = investigated['raw_analysis'].get('quality_metrics', {})
 
         quality_report = {
             "report_type": "Data Quality Assessment",
-            "generated_at": datetime.now().isoformat(),
+            "generated_at": generated_at,
             "collection_statistics": {
                 "total_files": quality_metrics.get('total_files_collected', 0),
                 "average_files_per_ticker": quality_metrics.get('average_files_per_ticker', 0),
@@ -630,8 +799,7 @@ class EnhancedFailureAnalyzer:
         }
 
         report_path = f"{self.error_records_path}/reports/quality_assessment_{timestamp}.json"
-        with open(report_path, 'w') as f:
-            json.dump(quality_report, f, indent=2)
+        await asyncio.to_thread(self._write_json, report_path, quality_report)
 
     def _identify_patterns(self, failures: List[Dict[str, Any]]) -> List[str]:
         """Identify common patterns in failures"""
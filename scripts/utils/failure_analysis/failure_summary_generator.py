@@ -6,15 +6,25 @@ Creates corrected failure analysis with proper categorization and actionable ins
 """
 
 import os
+import sys
 import json
+import orjson
 from datetime import datetime
 from collections import defaultdict, Counter
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any
 import logging
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from _dir_scan import count_json_files
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+MARKET_CAP_THRESHOLD = 2_000_000_000  # $2B investment threshold
+
 class FailureSummaryGenerator:
     def __init__(self):
         self.base_path = "/workspaces/data/raw_data/polygon"
@@ -93,15 +103,17 @@ class FailureSummaryGenerator:
         collection_stats = {}
 
         if os.path.exists(self.base_path):
-            for ticker_dir in os.listdir(self.base_path):
-                ticker_path = os.path.join(self.base_path, ticker_dir)
-                if not os.path.isdir(ticker_path) or ticker_dir.startswith('.'):
-                    continue
+            with os.scandir(self.base_path) as ticker_entries:
+                ticker_dirs = [entry for entry in ticker_entries
+                               if not entry.name.startswith('.') and entry.is_dir()]
 
-                file_count = 0
-                for root, dirs, files in os.walk(ticker_path):
-                    file_count += len([f for f in files if f.endswith('.json')])
+            # Each ticker tree is an independent, I/O-bound walk, so overlap them on
+            # threads; map() keeps the listing order for the results
+            with ThreadPoolExecutor(max_workers=32) as executor:
+                file_counts = executor.map(count_json_files, [entry.path for entry in ticker_dirs])
 
+            for ticker_entry, file_count in zip(ticker_dirs, file_counts):
+                ticker_dir = ticker_entry.name
                 if file_count > 0:
                     collected_tickers.add(ticker_dir)
                     collection_stats[ticker_dir] = {
@@ -120,7 +132,7 @@ class FailureSummaryGenerator:
             market_cap = ticker_info.get('market_cap', 0)
 
             # Categorize based on available information
-            if market_cap < 2000000000:  # $2B threshold
+            if market_cap < MARKET_CAP_THRESHOLD:
                 category = 'INSUFFICIENT_MARKET_CAP'
                 reason = f"Market cap ${market_cap:,.0f} below $2B threshold"
             elif market_cap == 0 or not ticker_info:
@@ -262,6 +274,12 @@ class FailureSummaryGenerator:
 
         return recommendations
 
+    @staticmethod
+    def _write_json(file_path: str, obj: Any):
+        """Write obj as indented JSON"""
+        with open(file_path, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+
     def _save_summary_reports(self, summary: Dict[str, Any]):
         """Save summary reports to error records"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -283,13 +301,11 @@ class FailureSummaryGenerator:
         }
 
         exec_path = f"{self.error_records_path}/summary/executive_summary_corrected_{timestamp}.json"
-        with open(exec_path, 'w') as f:
-            json.dump(exec_summary, f, indent=2)
+        self._write_json(exec_path, exec_summary)
 
         # 2. Detailed Analysis
         detailed_path = f"{self.error_records_path}/summary/detailed_analysis_corrected_{timestamp}.json"
-        with open(detailed_path, 'w') as f:
-            json.dump(summary, f, indent=2)
+        self._write_json(detailed_path, summary)
 
         # 3. Category Breakdown CSV-friendly format
         category_breakdown = []
@@ -303,8 +319,7 @@ class FailureSummaryGenerator:
                 })
 
         breakdown_path = f"{self.error_records_path}/summary/failure_breakdown_{timestamp}.json"
-        with open(breakdown_path, 'w') as f:
-            json.dump(category_breakdown, f, indent=2)
+        self._write_json(breakdown_path, category_breakdown)
 
         logger.info(f"Summary reports saved:")
         logger.info(f"  Executive: {exec_path}")
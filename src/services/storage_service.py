@@ -13,6 +13,10 @@ from .robust_file_writer import RobustFileWriter
 
 logger = structlog.get_logger()
 
+# Per-ticker company data written by merge_company_data.py --sidecar runs:
+# historical/daily/{TICKER}/company_data.json
+COMPANY_SIDECAR_NAME = "company_data.json"
+
 
 class StorageService:
     """
@@ -165,6 +169,12 @@ class StorageService:
             async with aiofiles.open(file_path, 'r') as f:
                 data = json.loads(await f.read())
             
+            # Records enhanced with --sidecar keep company data once per ticker
+            if 'company_data' not in data:
+                company_data = await self._load_company_sidecar(file_path.parents[2])
+                if company_data is not None:
+                    data['company_data'] = company_data
+            
             # Convert back to StockDataRecord (simplified - would need full deserialization)
             self.logger.info("Daily record loaded", ticker=ticker, date=date_str)
             return data  # Return dict for now, could implement full object reconstruction
@@ -174,6 +184,20 @@ class StorageService:
                             ticker=ticker, date=date_str, error=str(e))
             return None
     
+    async def _load_company_sidecar(self, ticker_dir: Path) -> Optional[Dict[str, Any]]:
+        """company_data from a ticker's sidecar file, or None if there is none"""
+        sidecar_path = ticker_dir / COMPANY_SIDECAR_NAME
+        if not sidecar_path.exists():
+            return None
+        
+        try:
+            async with aiofiles.open(sidecar_path, 'r') as f:
+                return json.loads(await f.read()).get('company_data')
+        except Exception as e:
+            self.logger.warning("Failed to load company data sidecar",
+                              path=str(sidecar_path), error=str(e))
+            return None
+    
     async def load_ticker_date_range(
         self, 
         ticker: str, 
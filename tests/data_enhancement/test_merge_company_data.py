@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Test the company data merger's backups, API retries and skip checks without network access
+"""
+
+import asyncio
+import json
+import logging
+import sys
+import tarfile
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / 'scripts' / 'utils' / 'data_enhancement'))
+
+# The script logs to a fixed file under /workspaces; keep that out of the test run
+with mock.patch('logging.FileHandler', lambda *args, **kwargs: logging.NullHandler()):
+    import merge_company_data
+from merge_company_data import CompanyDataMerger
+
+COMPANY_DATA = {'sector': 'ELECTRONIC COMPUTERS', 'industry': 'CS', 'primary_exchange': 'XNAS', 'cik': '0000320193'}
+
+
+def _write_daily(base: Path, ticker: str, date: str, **extra) -> Path:
+    path = base / ticker / date[:4] / date[5:7] / f'{date}.json'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'ticker': ticker, 'date': date, 'ohlcv': {'close': 10.0}, **extra}, f, indent=2)
+    return path
+
+
+def _merger(monkeypatch, company_data=COMPANY_DATA, **kwargs) -> CompanyDataMerger:
+    merger = CompanyDataMerger('test-key', **kwargs)
+
+    async def fake_get_company_data(ticker):
+        merger.stats["api_calls_made"] += 1
+        return company_data
+
+    monkeypatch.setattr(merger, 'get_company_data', fake_get_company_data)
+    return merger
+
+
+def test_backup_members_are_readable_before_close(tmp_path):
+    merger = CompanyDataMerger('test-key')
+    merger.backup_root = tmp_path.resolve()
+    paths = [_write_daily(tmp_path, 'AAPL', '2025-06-02'), _write_daily(tmp_path, 'MSFT', '2025-06-02')]
+    originals = [path.read_bytes() for path in paths]
+
+    arcnames = [merger.create_backup(path, raw) for path, raw in zip(paths, originals)]
+    assert arcnames == ['AAPL/2025/06/2025-06-02.json', 'MSFT/2025/06/2025-06-02.json']
+
+    # Every member is flushed as it is added, so a reader sees it while the run is still going
+    archive_path = tmp_path / 'backups' / f'{merger.merge_version}.tar'
+    with tarfile.open(archive_path) as archive:
+        assert [archive.extractfile(name).read() for name in arcnames] == originals
+
+    merger.close_backup_archive()
+    with tarfile.open(archive_path) as archive:
+        assert archive.getnames() == arcnames
+
+
+def test_standalone_backup_anchors_at_the_data_root(tmp_path):
+    merger = CompanyDataMerger('test-key')
+    path = _write_daily(tmp_path, 'AAPL', '2025-06-02')
+
+    assert merger.create_backup(path, path.read_bytes()) == 'AAPL/2025/06/2025-06-02.json'
+    merger.close_backup_archive()
+    assert (tmp_path / 'backups' / f'{merger.merge_version}.tar').exists()
+
+
+def test_merge_run_backs_up_originals_and_syncs_once_per_batch(tmp_path, monkeypatch):
+    paths = [_write_daily(tmp_path, ticker, '2025-06-02') for ticker in ('AAA', 'BBB', 'CCC')]
+    originals = {path: path.read_bytes() for path in paths}
+    fsyncs = []
+    real_fsync = merge_company_data.os.fsync
+    monkeypatch.setattr(merge_company_data.os, 'fsync', lambda fd: fsyncs.append(fd) or real_fsync(fd))
+
+    async def run():
+        async with _merger(monkeypatch) as merger:
+            await merger.merge_company_data(str(tmp_path), batch_size=2)
+        return merger
+
+    merger = asyncio.run(run())
+
+    # Two batches plus the final sync at close, not one fsync per file
+    assert len(fsyncs) == 3
+    assert merger.stats['files_enhanced'] == 3
+
+    with tarfile.open(tmp_path / 'backups' / f'{merger.merge_version}.tar') as archive:
+        for path, raw in originals.items():
+            assert archive.extractfile(str(path.relative_to(tmp_path))).read() == raw
+            assert json.loads(path.read_bytes())['company_data'] == COMPANY_DATA
+
+
+class _FakeResponse:
+    def __init__(self, status, payload=None, headers=None):
+        self.status = status
+        self.headers = headers or {}
+        self._payload = payload
+
+    async def json(self):
+        return self._payload
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _FakeSession:
+    """Hands out the queued responses in order, one per GET"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def get(self, url, params=None):
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+OK_RESPONSE = {'status': 'OK', 'results': {'sic_description': 'ELECTRONIC COMPUTERS', 'type': 'CS',
+                                           'primary_exchange': 'XNAS', 'cik': '0000320193'}}
+
+
+def _run_get_company_data(monkeypatch, responses):
+    merger = CompanyDataMerger('test-key')
+    merger.session = _FakeSession(responses)
+    sleeps = []
+
+    async def no_rate_limit():
+        pass
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr(merger, '_rate_limit', no_rate_limit)
+    monkeypatch.setattr(merge_company_data.asyncio, 'sleep', fake_sleep)
+    return asyncio.run(merger.get_company_data('AAPL')), merger, sleeps
+
+
+def test_retries_server_errors_with_backoff(monkeypatch):
+    result, merger, sleeps = _run_get_company_data(
+        monkeypatch, [_FakeResponse(503), _FakeResponse(502), _FakeResponse(200, OK_RESPONSE)])
+
+    assert result == COMPANY_DATA
+    assert merger.session.calls == merger.stats['api_calls_made'] == 3
+    assert 1 <= sleeps[0] < 2 and 2 <= sleeps[1] < 3  # 2**attempt plus up to 1s of jitter
+
+
+def test_honors_retry_after_up_to_the_cap(monkeypatch):
+    result, _, sleeps = _run_get_company_data(monkeypatch, [
+        _FakeResponse(429, headers={'Retry-After': '7'}),
+        _FakeResponse(429, headers={'Retry-After': '120'}),
+        _FakeResponse(429, headers={'Retry-After': 'Wed, 21 Oct 2025 07:28:00 GMT'}),
+        _FakeResponse(200, OK_RESPONSE),
+    ])
+
+    assert result == COMPANY_DATA
+    assert sleeps[:2] == [7.0, 30.0]
+    assert 4 <= sleeps[2] < 5  # HTTP-date form falls back to exponential backoff
+
+
+def test_gives_up_after_max_attempts(monkeypatch):
+    result, merger, sleeps = _run_get_company_data(monkeypatch, [_FakeResponse(500) for _ in range(5)])
+
+    assert result is None
+    assert merger.session.calls == merger.max_attempts
+    assert len(sleeps) == merger.max_attempts - 1  # no pause after the last attempt
+
+
+@pytest.mark.parametrize('response', [_FakeResponse(404), _FakeResponse(403),
+                                      _FakeResponse(200, {'status': 'NOT_FOUND'})])
+def test_non_retryable_responses_return_none_at_once(monkeypatch, response):
+    result, merger, sleeps = _run_get_company_data(monkeypatch, [response])
+
+    assert result is None
+    assert merger.session.calls == 1 and sleeps == []
+
+
+@pytest.mark.parametrize('record, indent', [
+    ({'ticker': 'AAPL', 'company_data': COMPANY_DATA}, 2),
+    ({'ticker': 'AAPL', 'company_data': COMPANY_DATA}, None),
+    ({'ticker': 'AAPL', 'metadata': {'company_data': COMPANY_DATA}}, 2),
+    ({'ticker': 'AAPL', 'notes': 'no "company_data" yet'}, 2),
+    ({'ticker': 'AAPL'}, 2),
+])
+def test_has_company_data_never_reports_a_missing_key(record, indent):
+    raw = json.dumps(record, indent=indent).encode()
+    has_key = 'company_data' in json.loads(raw)
+
+    # A positive byte check must mean a real top-level key; only indent=2 files are recognized
+    assert CompanyDataMerger.has_company_data(raw) == (has_key and indent == 2)
+
+
+def test_discovery_skips_already_merged_files(tmp_path, monkeypatch):
+    merged = _write_daily(tmp_path, 'AAPL', '2025-06-02', company_data=COMPANY_DATA)
+    pending = _write_daily(tmp_path, 'AAPL', '2025-06-03')
+    nested = _write_daily(tmp_path, 'MSFT', '2025-06-02', metadata={'company_data': {}})
+
+    merger = _merger(monkeypatch)
+    found = sorted(merger.find_files_to_enhance(str(tmp_path)))
+
+    assert found == sorted([(str(pending), 'AAPL'), (str(nested), 'MSFT')])
+    assert merger.stats['files_skipped'] == 1
+    assert str(merged) not in dict(found)
+
+
+def test_sidecar_run_writes_one_file_per_ticker(tmp_path, monkeypatch):
+    daily = [_write_daily(tmp_path, 'AAPL', date) for date in ('2025-06-02', '2025-06-03', '2025-07-01')]
+    originals = [path.read_bytes() for path in daily]
+
+    async def run():
+        async with _merger(monkeypatch, sidecar=True) as merger:
+            await merger.merge_company_data(str(tmp_path))
+        return merger
+
+    merger = asyncio.run(run())
+
+    sidecar = tmp_path / 'AAPL' / merge_company_data.COMPANY_SIDECAR_NAME
+    payload = json.loads(sidecar.read_text())
+    assert payload['ticker'] == 'AAPL' and payload['company_data'] == COMPANY_DATA
+    assert not list(sidecar.parent.glob('*.tmp'))
+    assert merger.stats['sidecars_written'] == 1 and merger.stats['api_calls_made'] == 1
+    assert [path.read_bytes() for path in daily] == originals
+
+    # A re-run neither calls the API again nor treats the sidecar as a daily file
+    rerun = _merger(monkeypatch, sidecar=True)
+    assert all(not path.endswith(merge_company_data.COMPANY_SIDECAR_NAME)
+               for path, _ in rerun.find_files_to_enhance(str(tmp_path)))
+    asyncio.run(rerun.merge_company_data(str(tmp_path)))
+    assert rerun.stats['api_calls_made'] == 0 and rerun.stats['sidecars_written'] == 0
+
+
+def test_storage_service_merges_the_sidecar_on_load(tmp_path, monkeypatch):
+    pytest.importorskip('structlog')
+    pytest.importorskip('aiofiles')
+    sys.path.append(str(Path(__file__).resolve().parents[2]))
+    from src.services import storage_service
+    assert storage_service.COMPANY_SIDECAR_NAME == merge_company_data.COMPANY_SIDECAR_NAME
+
+    daily_root = tmp_path / 'historical' / 'daily'
+    _write_daily(daily_root, 'AAPL', '2025-06-02')
+    _write_daily(daily_root, 'MSFT', '2025-06-02', company_data={'sector': 'IN FILE'})
+    merger = _merger(monkeypatch)
+    for ticker in ('AAPL', 'MSFT'):
+        merger.write_company_sidecar(daily_root / ticker / '2025' / '06' / '2025-06-02.json', ticker, COMPANY_DATA)
+
+    storage = storage_service.StorageService(base_path=str(tmp_path))
+    record = asyncio.run(storage.load_daily_record('AAPL', '2025-06-02'))
+    assert record['company_data'] == COMPANY_DATA and record['ticker'] == 'AAPL'
+
+    # company_data already in the daily file wins over the sidecar
+    record = asyncio.run(storage.load_daily_record('MSFT', '2025-06-02'))
+    assert record['company_data'] == {'sector': 'IN FILE'}
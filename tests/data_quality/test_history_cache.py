@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test the Parquet price history cache and its coverage index
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / 'scripts' / 'utils' / 'data_quality'))
+
+from _history_cache import HistoryCache, IndicatorState, HISTORY_COLUMNS
+
+
+def _bars(start: str, end: str, offset: float = 0.0) -> pd.DataFrame:
+    """Business-day bars for [start, end] indexed by 'YYYY-MM-DD' strings"""
+    dates = pd.bdate_range(start, end).strftime('%Y-%m-%d')
+    values = [[100.0 + i + offset, 101.0 + i, 99.0 + i, 100.5 + i, 1_000_000.0 + i] for i in range(len(dates))]
+    return pd.DataFrame(values, index=pd.Index(dates), columns=HISTORY_COLUMNS)
+
+
+@pytest.mark.parametrize('window, expected', [
+    (('2025-06-02', '2025-06-30'), None),                          # inside the coverage
+    (('2025-06-10', '2025-07-03'), ('2025-07-01', '2025-07-03')),  # runs past the end
+    (('2025-07-01', '2025-07-03'), ('2025-07-01', '2025-07-03')),  # starts the day after it
+    (('2025-05-20', '2025-06-15'), ('2025-05-20', '2025-05-31')),  # starts before it
+    (('2025-05-20', '2025-07-03'), ('2025-05-20', '2025-07-03')),  # past both ends
+    (('2025-08-01', '2025-08-29'), ('2025-08-01', '2025-08-29')),  # disjoint
+])
+def test_missing_range_is_only_the_uncovered_part(tmp_path, window, expected):
+    cache = HistoryCache('test', cache_dir=tmp_path)
+    assert cache.missing_range('AAPL', *window) == window
+
+    cache.put('AAPL', '2025-06-01', '2025-06-30', _bars('2025-06-01', '2025-06-30'))
+    assert cache.missing_range('AAPL', *window) == expected
+    assert (cache.get('AAPL', *window) is None) == (expected is not None)
+
+
+def test_moving_daily_window_only_fetches_the_new_day(tmp_path):
+    cache = HistoryCache('test', cache_dir=tmp_path)
+    cache.put('AAPL', '2025-04-22', '2025-07-01', _bars('2025-04-22', '2025-07-01'))
+    cache.save()
+
+    # Next day's run: the 70-day window moved forward by one day
+    cache = HistoryCache('test', cache_dir=tmp_path)
+    fetch_range = cache.missing_range('AAPL', '2025-04-23', '2025-07-02')
+    assert fetch_range == ('2025-07-02', '2025-07-02')
+
+    cache.put('AAPL', *fetch_range, _bars('2025-07-02', '2025-07-02', offset=0.25))
+    window = cache.get('AAPL', '2025-04-23', '2025-07-02')
+    expected = pd.concat([_bars('2025-04-22', '2025-07-01'), _bars('2025-07-02', '2025-07-02', offset=0.25)])
+    pd.testing.assert_frame_equal(window, expected.loc['2025-04-23':], check_names=False)
+    assert cache.missing_range('AAPL', '2025-04-23', '2025-07-02') is None
+
+
+def test_put_merges_overlaps_and_replaces_disjoint_ranges(tmp_path):
+    cache = HistoryCache('test', cache_dir=tmp_path)
+    cache.put('AAPL', '2025-06-02', '2025-06-06', _bars('2025-06-02', '2025-06-06'))
+
+    # Overlapping fetch: coverage widens and re-fetched dates take the new values
+    cache.put('AAPL', '2025-06-05', '2025-06-10', _bars('2025-06-05', '2025-06-10', offset=50.0))
+    merged = cache.get('AAPL', '2025-06-02', '2025-06-10')
+    assert list(merged.index) == list(pd.bdate_range('2025-06-02', '2025-06-10').strftime('%Y-%m-%d'))
+    assert merged.loc['2025-06-04', 'open'] == 102.0 and merged.loc['2025-06-05', 'open'] == 150.0
+
+    # Disjoint fetch: the old bars go with the old coverage so no gap is ever reported as covered
+    cache.put('AAPL', '2025-09-01', '2025-09-05', _bars('2025-09-01', '2025-09-05'))
+    assert cache.missing_range('AAPL', '2025-06-02', '2025-06-10') == ('2025-06-02', '2025-06-10')
+    assert cache.bars('AAPL', '2025-06-01', '2025-06-30').empty
+
+
+def test_empty_fetch_widens_coverage_and_keeps_stored_bars(tmp_path):
+    cache = HistoryCache('test', cache_dir=tmp_path)
+    bars = _bars('2025-06-02', '2025-06-06')
+    cache.put('AAPL', '2025-06-02', '2025-06-06', bars)
+
+    # A weekend with no bars
+    cache.put('AAPL', '2025-06-07', '2025-06-08', None)
+    pd.testing.assert_frame_equal(cache.get('AAPL', '2025-06-02', '2025-06-08'), bars)
+
+    # A ticker with no bars at all is remembered as "fetched, nothing there"
+    cache.put('NOBARS', '2025-06-02', '2025-06-06', None)
+    empty = cache.get('NOBARS', '2025-06-02', '2025-06-06')
+    assert empty is not None and empty.empty
+
+
+def test_bars_serves_stored_rows_without_full_coverage(tmp_path):
+    cache = HistoryCache('test', cache_dir=tmp_path)
+    cache.put('AAPL', '2025-06-02', '2025-06-06', _bars('2025-06-02', '2025-06-06'))
+
+    assert cache.get('AAPL', '2025-06-02', '2025-06-09') is None
+    assert list(cache.bars('AAPL', '2025-06-04', '2025-06-09').index) == ['2025-06-04', '2025-06-05', '2025-06-06']
+    assert cache.bars('MSFT', '2025-06-02', '2025-06-09').empty
+
+
+def test_save_round_trips_bars_and_coverage(tmp_path):
+    cache = HistoryCache('test', cache_dir=tmp_path)
+    bars = _bars('2025-06-02', '2025-06-03')
+    cache.put('AAPL', '2025-06-02', '2025-06-03', bars)
+    cache.put('NOBARS', '2025-06-02', '2025-06-03', None)
+    cache.save()
+
+    reloaded = HistoryCache('test', cache_dir=tmp_path)
+    pd.testing.assert_frame_equal(reloaded.get('AAPL', '2025-06-02', '2025-06-03'), bars, check_names=False)
+    assert reloaded.get('NOBARS', '2025-06-02', '2025-06-03').empty
+
+
+def test_unreadable_cache_is_ignored(tmp_path):
+    (tmp_path / 'history_test.parquet').write_bytes(b'not parquet')
+    (tmp_path / 'history_test_coverage.json').write_text('{"AAPL": ["2025-06-02", "2025-06-03"]}')
+
+    cache = HistoryCache('test', cache_dir=tmp_path)
+    assert cache.get('AAPL', '2025-06-02', '2025-06-03') is None
+
+
+def test_indicator_state_round_trips(tmp_path):
+    state = IndicatorState('test', cache_dir=tmp_path)
+    state.rows['AAPL'] = {'date': '2025-06-02', 'close': 201.5, 'ema_12': 199.1, 'ema_26': 197.4,
+                          'macd_signal': 1.2, 'avg_gain': 1.1, 'avg_loss': 0.9, 'bars': 48}
+    state.save()
+
+    assert IndicatorState('test', cache_dir=tmp_path).rows == state.rows
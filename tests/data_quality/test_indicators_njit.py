@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Test the shared indicator kernels against their reference implementations
+"""
+
+import importlib.util
+import sys
+from functools import reduce
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+KERNELS_DIR = Path(__file__).resolve().parents[2] / 'scripts' / 'utils' / 'data_quality'
+sys.path.append(str(KERNELS_DIR))
+
+import _indicators_njit
+from _indicators_njit import (as_f8, _rolling_mean_std, _macd_bundle, _wilder_averages,
+                              _rsi_from_averages, _ema_step, _wilder_step)
+
+
+def _closes(n: int = 120, seed: int = 7) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 150.0 + np.cumsum(rng.normal(0.0, 1.5, n))
+
+
+def test_kernels_run_without_numba(monkeypatch):
+    """With numba missing the undecorated kernels give the same results"""
+    with monkeypatch.context() as patch:
+        patch.setitem(sys.modules, 'numba', None)  # makes `import numba` raise ImportError
+        spec = importlib.util.spec_from_file_location('_indicators_plain', KERNELS_DIR / '_indicators_njit.py')
+        plain = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(plain)
+    assert not hasattr(plain._macd_bundle, 'py_func')  # a plain function, not a numba dispatcher
+
+    closes = as_f8(_closes())
+    np.testing.assert_allclose(plain._macd_bundle(closes, 12, 26, 9),
+                               _indicators_njit._macd_bundle(closes, 12, 26, 9), rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(plain._wilder_averages(closes, 14),
+                               _indicators_njit._wilder_averages(closes, 14), rtol=1e-12)
+
+
+@pytest.mark.parametrize('window', [5, 20, 50])
+@pytest.mark.parametrize('ddof', [0, 1])
+def test_rolling_mean_std_matches_pandas(window, ddof):
+    closes = _closes()
+    mean, std = _rolling_mean_std(closes, window, ddof=ddof)
+
+    rolling = pd.Series(closes).rolling(window)
+    np.testing.assert_allclose(mean, rolling.mean().to_numpy()[window - 1:], rtol=1e-9)
+    np.testing.assert_allclose(std, rolling.std(ddof=ddof).to_numpy()[window - 1:], rtol=1e-6)
+
+
+def test_rolling_std_of_a_flat_series_is_zero():
+    # Running sums can leave a tiny negative variance; it must be clamped, not turned into NaN
+    mean, std = _rolling_mean_std(np.full(30, 42.7), 20, ddof=1)
+    np.testing.assert_allclose(mean, 42.7)
+    np.testing.assert_allclose(std, 0.0, atol=1e-6)
+
+
+def test_macd_bundle_matches_pandas_ewm():
+    closes = _closes()
+    ema_fast, ema_slow, macd, signal, histogram = _macd_bundle(as_f8(closes), 12, 26, 9)
+
+    series = pd.Series(closes)
+    ref_fast = series.ewm(span=12, adjust=False).mean()
+    ref_slow = series.ewm(span=26, adjust=False).mean()
+    ref_macd = ref_fast - ref_slow
+    ref_signal = ref_macd.ewm(span=9, adjust=False).mean()
+
+    assert ema_fast == pytest.approx(ref_fast.iloc[-1], rel=1e-9)
+    assert ema_slow == pytest.approx(ref_slow.iloc[-1], rel=1e-9)
+    assert macd == pytest.approx(ref_macd.iloc[-1], rel=1e-9, abs=1e-9)
+    assert signal == pytest.approx(ref_signal.iloc[-1], rel=1e-9, abs=1e-9)
+    assert histogram == pytest.approx(ref_macd.iloc[-1] - ref_signal.iloc[-1], rel=1e-9, abs=1e-9)
+
+
+@pytest.mark.parametrize('new_bars', [1, 5])
+def test_incremental_steps_match_full_recompute(new_bars):
+    """Advancing stored state bar by bar gives the same values as a cold start"""
+    closes = _closes(200)
+    history = as_f8(closes[:-new_bars])
+
+    ema_12, ema_26, _, macd_signal, _ = _macd_bundle(history, 12, 26, 9)
+    avg_gain, avg_loss = _wilder_averages(history, 14)
+    previous = float(history[-1])
+    for price in closes[-new_bars:]:
+        delta = price - previous
+        ema_12 = _ema_step(ema_12, price, 12)
+        ema_26 = _ema_step(ema_26, price, 26)
+        macd_signal = _ema_step(macd_signal, ema_12 - ema_26, 9)
+        avg_gain = _wilder_step(avg_gain, max(delta, 0.0), 14)
+        avg_loss = _wilder_step(avg_loss, max(-delta, 0.0), 14)
+        previous = price
+
+    full_12, full_26, _, full_signal, _ = _macd_bundle(as_f8(closes), 12, 26, 9)
+    full_gain, full_loss = _wilder_averages(as_f8(closes), 14)
+
+    assert ema_12 == pytest.approx(full_12, rel=1e-9)
+    assert ema_26 == pytest.approx(full_26, rel=1e-9)
+    assert macd_signal == pytest.approx(full_signal, rel=1e-9, abs=1e-9)
+    assert avg_gain == pytest.approx(full_gain, rel=1e-9)
+    assert avg_loss == pytest.approx(full_loss, rel=1e-9)
+
+
+def test_wilder_rsi_matches_pandas_reference():
+    closes = _closes()
+    avg_gain, avg_loss = _wilder_averages(as_f8(closes), 14)
+
+    # Wilder smoothing: seeded with the simple mean of the first 14 moves, then alpha=1/14
+    deltas = pd.Series(closes).diff().dropna()
+    gains, losses = deltas.clip(lower=0.0), (-deltas).clip(lower=0.0)
+    ref_gain = pd.concat([pd.Series([gains.iloc[:14].mean()]), gains.iloc[14:]]).ewm(alpha=1 / 14, adjust=False).mean()
+    ref_loss = pd.concat([pd.Series([losses.iloc[:14].mean()]), losses.iloc[14:]]).ewm(alpha=1 / 14, adjust=False).mean()
+
+    assert avg_gain == pytest.approx(ref_gain.iloc[-1], rel=1e-9)
+    assert avg_loss == pytest.approx(ref_loss.iloc[-1], rel=1e-9)
+    assert _rsi_from_averages(avg_gain, avg_loss) == pytest.approx(
+        100 - 100 / (1 + ref_gain.iloc[-1] / ref_loss.iloc[-1]), rel=1e-9)
+    assert _rsi_from_averages(1.0, 0.0) == 100.0
+
+
+def test_as_f8_gives_one_writable_contiguous_float64_type():
+    read_only = pd.Series([1, 2, 3, 4]).to_numpy()
+    read_only.flags.writeable = False
+    strided = np.arange(10.0)[::2]
+
+    for values in (read_only, strided, [1.5, 2.5]):
+        array = as_f8(values)
+        assert array.dtype == np.float64
+        assert array.flags['C_CONTIGUOUS'] and array.flags['WRITEABLE']
+        np.testing.assert_array_equal(array, np.asarray(values, dtype=np.float64))
+
+    already = np.arange(4.0)
+    assert as_f8(already) is already  # no copy when nothing needs converting
+
+
+@pytest.mark.parametrize('period', [12, 26])
+def test_scalar_ema_recurrence_matches_pandas(period):
+    closes = _closes()
+    last_ema = reduce(lambda ema, price: _ema_step(ema, price, period), closes[1:], closes[0])
+
+    assert last_ema == pytest.approx(pd.Series(closes).ewm(span=period, adjust=False).mean().iloc[-1], rel=1e-12)
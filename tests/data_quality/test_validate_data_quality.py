@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test the coverage probes and grading of validate_data_quality.py against a full JSON
+parse and the original if/elif grading
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / 'scripts' / 'utils' / 'data_quality'))
+
+from validate_data_quality import DataQualityValidator, _probe
+
+
+def _reference_flags(data):
+    return ('technical_indicators' in data or 'technical' in data,
+            'fundamentals' in data or 'fundamental' in data)
+
+
+def _reference_grade(tech_coverage, fund_coverage):
+    if tech_coverage >= 99 and fund_coverage >= 99:
+        return "A+", 99.9
+    elif tech_coverage >= 95 and fund_coverage >= 90:
+        return "A", 95.0
+    elif tech_coverage >= 85 and fund_coverage >= 80:
+        return "B+", 85.0
+    elif tech_coverage >= 70 and fund_coverage >= 70:
+        return "B", 75.0
+    return "C", 60.0
+
+
+DAILY_RECORDS = {
+    'both': {'ticker': 'XYZ', 'technical_indicators': {'rsi': 55.0}, 'fundamentals': {'pe_ratio': 12.0}},
+    'legacy_keys': {'ticker': 'XYZ', 'technical': {'rsi': 55.0}, 'fundamental': {'beta': 1.1}},
+    'none': {'ticker': 'XYZ', 'ohlcv': {'close': 10.0}},
+    'nested_only': {'ticker': 'XYZ', 'metadata': {'technical_indicators': {}, 'fundamentals': {}}},
+    'in_values': {'ticker': 'XYZ', 'notes': ['technical', 'fundamentals'], 'source': '"fundamental"'},
+    'mixed': {'ticker': 'XYZ', 'technical_indicators': {}, 'metadata': {'fundamentals': None}},
+}
+
+
+@pytest.mark.parametrize('name', sorted(DAILY_RECORDS))
+@pytest.mark.parametrize('indent', [2, None])
+@pytest.mark.parametrize('ticker', ['XYZ', 'AAPL'])
+def test_probe_matches_full_parse(tmp_path, name, indent, ticker):
+    data = DAILY_RECORDS[name]
+    file_path = tmp_path / f'{name}.json'
+    with open(file_path, 'w') as f:
+        json.dump(data, f, indent=indent)
+
+    has_tech, has_fund, sample = _probe(str(file_path), ticker)
+    assert (has_tech, has_fund) == _reference_flags(data)
+    if ticker == 'AAPL':  # sample tickers are always parsed for their key counts
+        assert sample['ticker'] == 'AAPL'
+        assert (sample['has_tech'], sample['has_fund']) == _reference_flags(data)
+    else:
+        assert sample is None
+
+
+def test_probe_missing_and_unparseable_files(tmp_path):
+    assert _probe(str(tmp_path / 'missing.json'), 'XYZ') is None
+
+    broken = tmp_path / 'broken.json'
+    broken.write_bytes(b'{\n  "technical": {')
+    assert _probe(str(broken), 'AAPL') == (False, False, None)
+
+
+def test_grade_matches_original_thresholds():
+    coverages = [0, 50, 69.9, 70, 79.9, 80, 84.9, 85, 89.9, 90, 94.9, 95, 98.9, 99, 100]
+    for tech in coverages:
+        for fund in coverages:
+            assert DataQualityValidator.grade(tech, fund) == _reference_grade(tech, fund), (tech, fund)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test the vectorized failure categorization against the original per-ticker if/elif
+"""
+
+import math
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / 'scripts' / 'utils' / 'failure_analysis'))
+
+from analyze_failures_without_api import FailureAnalyzerNoAPI, INPUT_DEFAULTS, _US_COUNTRIES
+
+
+def _reference_category(ticker_info):
+    if not ticker_info:
+        return 'INSUFFICIENT_DATA'
+
+    market_cap = ticker_info.get('market_cap', 0)
+    country = ticker_info.get('country', 'Unknown')
+
+    if country and country.upper() not in _US_COUNTRIES:
+        return 'NON_US_MARKET'
+    elif market_cap == 0 or market_cap is None:
+        return 'NO_MARKET_DATA'
+    elif market_cap < 1_000_000_000:
+        return 'VERY_LOW_MARKET_CAP'
+    elif market_cap < 2_000_000_000:
+        return 'LOW_MARKET_CAP'
+    return 'VALID_LARGE_CAP'
+
+
+RAW_INPUT = {
+    'BIG': {'market_cap': 3_500_000_000_000, 'country': 'United States', 'exchange': 'NMS'},
+    'EDGE2B': {'market_cap': 2_000_000_000, 'country': 'US', 'exchange': 'NYQ'},
+    'MID': {'market_cap': 1_500_000_000, 'country': 'usa', 'exchange': 'NYQ'},
+    'EDGE1B': {'market_cap': 1_000_000_000, 'country': 'U.S.', 'exchange': 'NYQ'},
+    'SMALL': {'market_cap': 250_000_000.5, 'country': 'U.S.A.', 'exchange': 'NCM'},
+    'ZERO': {'market_cap': 0, 'country': 'United States', 'exchange': 'NMS'},
+    'NULLCAP': {'market_cap': None, 'country': 'United States', 'exchange': 'NMS'},
+    'NANCAP': {'market_cap': math.nan, 'country': 'United States', 'exchange': 'NMS'},
+    'NOCAP': {'country': 'United States', 'exchange': 'NMS'},
+    'FOREIGN': {'market_cap': 9_000_000_000, 'country': 'Canada', 'exchange': 'TOR'},
+    'NOCOUNTRY': {'market_cap': 9_000_000_000, 'exchange': 'NMS'},
+    'NULLCOUNTRY': {'market_cap': 9_000_000_000, 'country': None, 'exchange': 'NMS'},
+    'BLANKCOUNTRY': {'market_cap': 500_000_000, 'country': '', 'exchange': 'NMS'},
+}
+
+
+def test_categories_match_per_ticker_reference():
+    # Same trimming _load_input_data applies to the enriched yfinance records
+    input_lookup = {ticker: {k: item.get(k, default) for k, default in INPUT_DEFAULTS.items()}
+                    for ticker, item in RAW_INPUT.items()}
+    failed_tickers = [*RAW_INPUT, 'MISSING', 'BIG']
+
+    categorized = FailureAnalyzerNoAPI()._categorize_without_api(failed_tickers, input_lookup)
+
+    actual = {}
+    for category, data in categorized['categories'].items():
+        assert data['count'] == len(data['tickers'])
+        for entry in data['tickers']:
+            actual.setdefault(entry['ticker'], set()).add(category)
+
+    expected = {ticker: {_reference_category(input_lookup.get(ticker, {}))} for ticker in failed_tickers}
+    assert actual == expected
+    assert categorized['total_failures'] == len(failed_tickers)
+    assert sum(data['count'] for data in categorized['categories'].values()) == len(failed_tickers)
+
+
+def test_entries_keep_input_values():
+    input_lookup = {'NULLCAP': {'market_cap': None, 'country': 'US', 'exchange': 'NMS'},
+                    'SMALL': {'market_cap': 250_000_000, 'country': 'US', 'exchange': 'NMS'}}
+    categories = FailureAnalyzerNoAPI()._categorize_without_api(['NULLCAP', 'SMALL'], input_lookup)['categories']
+
+    assert categories['NO_MARKET_DATA']['tickers'] == [
+        {'ticker': 'NULLCAP', 'market_cap': None, 'issue': 'Missing or zero market cap'}]
+    small = categories['VERY_LOW_MARKET_CAP']['tickers'][0]
+    assert small == {'ticker': 'SMALL', 'market_cap': 250_000_000}
+    assert type(small['market_cap']) is int
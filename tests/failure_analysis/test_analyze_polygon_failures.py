@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Test the Polygon failure analyzer's probe cache and reports without network access
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+pytest.importorskip('aiohttp')
+orjson = pytest.importorskip('orjson')
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / 'scripts' / 'utils' / 'failure_analysis'))
+
+import analyze_polygon_failures
+from analyze_polygon_failures import PolygonFailureAnalyzer, TickerProbeCache
+
+
+class _FakeResponse:
+    def __init__(self, status, payload=None, headers=None):
+        self.status = status
+        self.headers = headers or {}
+        self._payload = payload
+
+    async def json(self):
+        return self._payload
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _FakeSession:
+    """Answers every GET with the same status"""
+
+    def __init__(self, status, payload=None):
+        self.status = status
+        self.payload = payload
+        self.calls = 0
+
+    def get(self, url, params=None):
+        self.calls += 1
+        return _FakeResponse(self.status, self.payload)
+
+
+def _analyzer(tmp_path, api_key='test-key') -> PolygonFailureAnalyzer:
+    # The analyzer creates its report and cache directories under /workspaces; keep them in tmp_path
+    with mock.patch.object(analyze_polygon_failures.os, 'makedirs'), \
+            mock.patch.object(analyze_polygon_failures, 'TickerProbeCache',
+                              lambda: TickerProbeCache(str(tmp_path / 'probe_cache'))):
+        analyzer = PolygonFailureAnalyzer(polygon_api_key=api_key)
+    analyzer.error_records_path = str(tmp_path)
+    return analyzer
+
+
+def test_probe_cache_round_trips_and_expires(tmp_path):
+    cache = TickerProbeCache(str(tmp_path))
+    body = {'status': 'OK', 'results': {'ticker': 'BRK/B', 'market': 'stocks'}}
+    cache.put('BRK/B', 'reference', 200, body)
+    cache.put('BRK/B', 'aggregate', 404, None)
+
+    assert cache.get('BRK/B', 'reference', ttl=3600) == (200, body)
+    assert cache.get('BRK/B', 'aggregate', ttl=3600) == (404, None)
+    assert cache.get('BRK/B', 'reference', ttl=0) is None  # expired
+    assert cache.get('MSFT', 'reference', ttl=3600) is None
+
+    # Written with write-then-rename: one file per ticker and no temp files left behind
+    assert [p.name for p in tmp_path.iterdir()] == ['BRK_B.json']
+
+
+def test_probe_cache_ignores_corrupt_files(tmp_path):
+    cache = TickerProbeCache(str(tmp_path))
+    (tmp_path / 'AAPL.json').write_bytes(b'{"reference": {"ts": ')
+
+    assert cache.get('AAPL', 'reference', ttl=3600) is None
+    cache.put('AAPL', 'reference', 200, {'status': 'OK'})
+    assert cache.get('AAPL', 'reference', ttl=3600) == (200, {'status': 'OK'})
+
+
+@pytest.mark.parametrize('status, cached', [(200, True), (404, True), (401, False), (429, False),
+                                            (500, False), (503, False)])
+def test_probe_caches_only_ticker_facts(tmp_path, status, cached):
+    analyzer = _analyzer(tmp_path)
+    analyzer._pause_for_rate_limit = lambda retry_after: None
+    session = _FakeSession(status, {'status': 'OK', 'results': {}} if status < 400 else None)
+
+    async def probe_twice():
+        for _ in range(2):
+            result = await analyzer._probe(session, 'AAPL', 'reference', 'https://example.invalid', 3600)
+        return result
+
+    assert asyncio.run(probe_twice())[0] == status
+    # 2xx/404 describe the ticker and are reused; auth, rate-limit and server errors are re-fetched
+    assert session.calls == (1 if cached else 2)
+
+
+HEADER = {
+    "report_type": "Detailed Ticker Failure Analysis",
+    "generated_at": "2025-09-26T21:04:49.123456",
+}
+
+TICKER_DETAILS = {
+    'ZZZ': {'category': 'TICKER_DELISTED', 'reason': 'Ticker not found (404)', 'timestamp': '2025-09-26T21:00:00'},
+    'AAA': {'category': 'API_RATE_LIMIT', 'reason': 'HTTP 429', 'timestamp': '2025-09-26T21:00:01'},
+    'MMM': {'category': 'TICKER_DELISTED', 'reason': 'Ticker inactive', 'timestamp': '2025-09-26T21:00:02'},
+    'BRK.B': {'category': 'UNKNOWN', 'reason': 'Café "quoted" \\ reason\nline two', 'timestamp': None},
+    'QQQ': {'category': 'API_RATE_LIMIT', 'reason': 'HTTP 429', 'timestamp': '2025-09-26T21:00:03'},
+}
+
+
+def _reference_report(ticker_details):
+    """The whole report built in memory, sorted by category, as _dump writes it"""
+    report = dict(HEADER, total_failed_tickers=len(ticker_details))
+    report['ticker_failures'] = dict(sorted(ticker_details.items(), key=lambda x: x[1]['category']))
+    return report
+
+
+@pytest.mark.parametrize('ticker_details', [TICKER_DETAILS, {}], ids=['tickers', 'empty'])
+def test_stream_matches_full_dump(tmp_path, ticker_details):
+    header = dict(HEADER, total_failed_tickers=len(ticker_details))
+    streamed_path = tmp_path / 'streamed.json'
+    dumped_path = tmp_path / 'dumped.json'
+
+    PolygonFailureAnalyzer._stream_detailed_report(str(streamed_path), header, ticker_details)
+    PolygonFailureAnalyzer._dump(str(dumped_path), _reference_report(ticker_details))
+
+    streamed = streamed_path.read_bytes()
+    assert streamed == dumped_path.read_bytes()
+    assert streamed == orjson.dumps(_reference_report(ticker_details), option=orjson.OPT_INDENT_2)
+
+
+def test_stream_is_valid_json_in_category_order(tmp_path):
+    header = dict(HEADER, total_failed_tickers=len(TICKER_DETAILS))
+    path = tmp_path / 'streamed.json'
+    PolygonFailureAnalyzer._stream_detailed_report(str(path), header, TICKER_DETAILS)
+
+    with open(path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+
+    assert report == _reference_report(TICKER_DETAILS)
+    assert list(report['ticker_failures']) == ['AAA', 'QQQ', 'ZZZ', 'MMM', 'BRK.B']
+
+
+def test_no_api_key_batch_shares_one_read_only_entry(tmp_path):
+    analyzer = _analyzer(tmp_path, api_key=None)
+    failure_data = {'categories': {'UNKNOWN': []}, 'category_counts': {'UNKNOWN': 0}, 'ticker_details': {}}
+    asyncio.run(analyzer._analyze_ticker_batch(None, ['AAPL', 'MSFT', 'BRK.B'], failure_data))
+
+    details = failure_data['ticker_details']
+    assert failure_data['category_counts']['UNKNOWN'] == 3
+    assert details['AAPL'] is details['MSFT'] is details['BRK.B']
+    with pytest.raises(TypeError):
+        details['AAPL']['category'] = 'TICKER_DELISTED'  # would relabel every ticker in the batch
+
+    # The shared entries still stream as plain objects
+    path = tmp_path / 'streamed.json'
+    PolygonFailureAnalyzer._stream_detailed_report(str(path), dict(HEADER, total_failed_tickers=3), details)
+    with open(path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    assert report['ticker_failures'] == {ticker: dict(entry) for ticker, entry in details.items()}
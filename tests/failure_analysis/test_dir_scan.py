@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Test the shared JSON file count against an os.walk reference
+"""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / 'scripts' / 'utils' / 'failure_analysis'))
+
+from _dir_scan import count_json_files
+
+
+def _walk_count(path) -> int:
+    """The os.walk count both failure scripts used before the scandir helper"""
+    return sum(1 for _, _, files in os.walk(path) for name in files if name.endswith('.json'))
+
+
+def test_count_matches_os_walk(tmp_path):
+    ticker = tmp_path / 'AAPL'
+    for relative in ('2025/06/2025-06-02.json', '2025/06/2025-06-03.json', '2025/07/2025-07-01.json',
+                     '2024/12/2024-12-31.json', 'collection_summary.json', '2025/06/notes.txt',
+                     '2025/06/.hidden.json'):
+        path = ticker / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('{}')
+    (ticker / 'empty').mkdir()
+    (ticker / 'not_json.json.bak').write_text('')
+
+    # Symlinked directories are not descended into; symlinked and dangling files still count
+    outside = tmp_path / 'outside'
+    outside.mkdir()
+    (outside / 'extra.json').write_text('{}')
+    (ticker / 'linked_dir').symlink_to(outside, target_is_directory=True)
+    (ticker / 'linked.json').symlink_to(outside / 'extra.json')
+    (ticker / 'dangling.json').symlink_to(tmp_path / 'missing.json')
+
+    assert count_json_files(str(ticker)) == _walk_count(ticker) == 8
+    assert count_json_files(str(ticker / 'empty')) == _walk_count(ticker / 'empty') == 0
+
+
+def test_missing_path_counts_nothing(tmp_path):
+    assert count_json_files(str(tmp_path / 'missing')) == _walk_count(tmp_path / 'missing') == 0
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Test the enhanced failure analyzer's directory scans, calendar and reports without network access
+"""
+
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+pytest.importorskip('orjson')
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / 'scripts' / 'utils' / 'failure_analysis'))
+
+import enhanced_failure_analyzer
+from enhanced_failure_analyzer import EnhancedFailureAnalyzer
+
+
+def _analyzer(tmp_path, api_key='test-key') -> EnhancedFailureAnalyzer:
+    # The analyzer creates its report directories under /workspaces; keep them in tmp_path
+    with mock.patch.object(enhanced_failure_analyzer.os, 'makedirs'):
+        analyzer = EnhancedFailureAnalyzer(polygon_api_key=api_key)
+    analyzer.base_path = str(tmp_path / 'polygon')
+    analyzer.error_records_path = str(tmp_path / 'polygon_failures')
+    for subdir in ('reports', 'investigations'):
+        os.makedirs(f"{analyzer.error_records_path}/{subdir}")
+    return analyzer
+
+
+def _write_daily(base: Path, ticker: str, date: str) -> Path:
+    path = base / ticker / date[:4] / date[5:7] / f'{date}.json'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text('{}')
+    return path
+
+
+def test_scan_follows_symlinked_ticker_dirs(tmp_path):
+    analyzer = _analyzer(tmp_path)
+    polygon = Path(analyzer.base_path)
+    _write_daily(polygon, 'AAPL', '2025-06-02')
+    _write_daily(polygon, 'AAPL', '2025-06-03')
+    _write_daily(tmp_path / 'elsewhere', 'MSFT', '2025-07-01')
+    (polygon / 'MSFT').symlink_to(tmp_path / 'elsewhere' / 'MSFT', target_is_directory=True)
+    _write_daily(polygon, 'OLD', '2024-12-31')
+    (polygon / '.cache').mkdir()
+    (polygon / 'collection_summary.json').write_text('{}')
+
+    collected, uncollected = analyzer._scan_collected_polygon_data()
+
+    assert sorted(collected) == ['AAPL', 'MSFT']
+    assert collected['MSFT']['total_files'] == 1 and collected['MSFT']['months_covered'] == ['07']
+    assert list(collected['AAPL']['date_range']) == ['2025-06-02', '2025-06-03']
+    assert uncollected == {'OLD': 1}
+
+
+NYSE_HOLIDAYS_2025 = ['2025-01-01', '2025-01-20', '2025-02-17', '2025-04-18', '2025-05-26',
+                      '2025-06-19', '2025-07-04', '2025-09-01', '2025-11-27', '2025-12-25']
+
+
+def test_expected_dates_skip_weekends_and_nyse_holidays(tmp_path):
+    pytest.importorskip('pandas')
+    analyzer = _analyzer(tmp_path)
+    dates = analyzer._get_expected_trading_dates('2025-01-01', '2025-12-31')
+
+    assert not set(NYSE_HOLIDAYS_2025) & set(dates)
+    assert len(dates) == 261 - len(NYSE_HOLIDAYS_2025)  # 2025 has 261 weekdays
+    assert dates[0] == '2025-01-02' and dates[-1] == '2025-12-31'
+    assert '2025-06-18' in dates and '2025-06-20' in dates
+
+    # The default analysis window ends on Labor Day; its expected dates are built once
+    window = analyzer._get_expected_trading_dates('2025-06-01', '2025-09-01')
+    assert window[-1] == '2025-08-29'
+    assert analyzer._get_expected_trading_dates('2025-06-01', '2025-09-01') is window
+
+
+def test_holidays_on_weekends_close_the_nearest_weekday(tmp_path):
+    pytest.importorskip('pandas')
+    dates = _analyzer(tmp_path)._get_expected_trading_dates('2026-06-15', '2026-07-10')
+
+    # 2026: Juneteenth is a Friday, Independence Day a Saturday (observed Friday July 3)
+    assert '2026-06-19' not in dates and '2026-07-03' not in dates
+    assert '2026-07-06' in dates
+
+
+def _failure(ticker: str, category: str, reason: str, priority: str = 'High', **extra):
+    return {'ticker': ticker, 'analysis_timestamp': '2025-09-26T21:00:00', 'category': category,
+            'detailed_reason': reason, 'remediation_priority': priority, 'investigation_notes': [], **extra}
+
+
+def test_category_reports_are_a_header_and_one_jsonl_line_per_failure(tmp_path):
+    analyzer = _analyzer(tmp_path)
+    no_data = [_failure('AAA', 'NO_DATA_COLLECTED', 'No data directory found'),
+               _failure('BBB', 'NO_DATA_COLLECTED', 'No data directory found', 'Medium',
+                        investigation_notes=['API check: Active: True'], exchanges={'XNYS'}),
+               _failure('CCC', 'NO_DATA_COLLECTED', 'Café "quoted"\nreason')]
+    investigated = {'failure_categories': {'NO_DATA_COLLECTED': no_data, 'UNKNOWN_ERROR': []}}
+
+    asyncio.run(analyzer._create_category_reports(investigated, '20250926_210449'))
+
+    investigations = Path(analyzer.error_records_path) / 'investigations'
+    base = investigations / 'category_no-data-collected_20250926_210449'
+    assert sorted(p.name for p in investigations.iterdir()) == [base.name + '.header.json', base.name + '.jsonl']
+
+    header = json.loads(base.with_name(base.name + '.header.json').read_text())
+    assert header['category'] == 'NO_DATA_COLLECTED' and header['total_failures'] == 3
+    assert header['failures_file'] == base.name + '.jsonl'
+    assert header['analysis']['common_patterns'] == ['2 failures: No data directory found']
+    assert header['analysis']['priority_distribution'] == {'High': 2, 'Medium': 1}
+
+    lines = base.with_name(base.name + '.jsonl').read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line) for line in lines] == [dict(no_data[0]), dict(no_data[1], exchanges=['XNYS']),
+                                                    dict(no_data[2])]
+
+    pd = pytest.importorskip('pandas')
+    frame = pd.read_json(base.with_name(base.name + '.jsonl'), lines=True)
+    assert list(frame['ticker']) == ['AAA', 'BBB', 'CCC']
+
+
+def _collection_data(ambiguous: int = 30) -> dict:
+    """Input with small caps (filtered locally) and large caps missing from collection"""
+    input_by_ticker = {f'BIG{i}': {'ticker': f'BIG{i}', 'market_cap': 5e9} for i in range(ambiguous)}
+    input_by_ticker.update({f'SMALL{i}': {'ticker': f'SMALL{i}', 'market_cap': 1e8} for i in range(5)})
+    return {'input_by_ticker': input_by_ticker, 'polygon_collected': {}, 'filtered_tickers': {},
+            'expected_dates': [], 'polygon_uncollected_dirs': {'BIG0': 3}}
+
+
+@pytest.mark.parametrize('api_key', ['test-key', None])
+def test_api_checks_only_ambiguous_failures_with_bounded_concurrency(tmp_path, monkeypatch, api_key):
+    analyzer = _analyzer(tmp_path, api_key=None)
+    analyzer.polygon_api_key = api_key  # no fallback to a POLYGON_API_KEY from the environment
+    checked, in_flight, peak = [], 0, 0
+
+    async def fake_check(ticker):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        checked.append(ticker)
+        if ticker == 'BIG1':
+            raise RuntimeError('connection reset')
+        return 'Active: True'
+
+    monkeypatch.setattr(analyzer, '_check_ticker_with_api', fake_check)
+    analysis = asyncio.run(analyzer._analyze_collection_discrepancies(_collection_data(), '2025-06-01', '2025-09-01'))
+    failures = analysis['detailed_failures']
+
+    assert len(failures) == 35
+    assert failures['BIG0']['category'] == 'PARTIAL_COLLECTION'
+    assert failures['SMALL0']['category'] == 'FILTERED_MARKET_CAP'
+    assert all(failures[f'SMALL{i}']['investigation_notes'] == [] for i in range(5))
+    if api_key is None:
+        assert checked == []
+        return
+
+    # Locally explained categories are never sent; the rest run with at most 20 requests in flight
+    assert sorted(checked) == sorted(f'BIG{i}' for i in range(30))
+    assert 1 < peak <= 20
+    assert failures['BIG2']['investigation_notes'] == ['API check: Active: True']
+    assert failures['BIG0']['investigation_notes'][-1] == 'API check: Active: True'
+    assert failures['BIG1']['investigation_notes'] == ['API check failed: connection reset']
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test the summary generator's collection scan against the original os.walk loop
+"""
+
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('orjson')
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / 'scripts' / 'utils' / 'failure_analysis'))
+
+import failure_summary_generator
+from failure_summary_generator import FailureSummaryGenerator
+
+
+def _reference_stats(base_path: str) -> dict:
+    """Collected tickers and their JSON file counts as the original listdir/os.walk loop found them"""
+    stats = {}
+    for ticker_dir in os.listdir(base_path):
+        ticker_path = os.path.join(base_path, ticker_dir)
+        if not os.path.isdir(ticker_path) or ticker_dir.startswith('.'):
+            continue
+        file_count = sum(len([f for f in files if f.endswith('.json')]) for _, _, files in os.walk(ticker_path))
+        if file_count > 0:
+            stats[ticker_dir] = {'files_collected': file_count, 'status': 'SUCCESS'}
+    return stats
+
+
+def _write(path: Path, text: str = '{}'):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def _generator(tmp_path) -> FailureSummaryGenerator:
+    generator = FailureSummaryGenerator()
+    generator.base_path = str(tmp_path / 'polygon')
+    return generator
+
+
+def test_collection_scan_matches_os_walk(tmp_path):
+    generator = _generator(tmp_path)
+    polygon = Path(generator.base_path)
+    for date in ('2025-06-02', '2025-06-03', '2025-07-01'):
+        _write(polygon / 'AAPL' / '2025' / date[5:7] / f'{date}.json')
+    _write(polygon / 'MSFT' / 'summary.json')
+    _write(polygon / 'EMPTY' / '2025' / '06' / 'notes.txt', '')
+    _write(polygon / '.cache' / 'AAPL.json')
+    _write(polygon / 'collection_summary.json')
+    _write(tmp_path / 'elsewhere' / 'NVDA' / '2025' / '06' / '2025-06-02.json')
+    (polygon / 'NVDA').symlink_to(tmp_path / 'elsewhere' / 'NVDA', target_is_directory=True)
+
+    analysis = generator._analyze_actual_collection_status(
+        [{'ticker': ticker, 'market_cap': 3e12} for ticker in ('AAPL', 'MSFT', 'NVDA', 'EMPTY')])
+
+    assert analysis['collection_stats'] == _reference_stats(generator.base_path)
+    assert analysis['collection_stats']['AAPL']['files_collected'] == 3
+    assert set(analysis['collection_stats']) == {'AAPL', 'MSFT', 'NVDA'}
+    assert list(analysis['failures']) == ['EMPTY']
+    assert analysis['collected_tickers'] == 3 and analysis['collection_rate'] == 75.0
+
+
+def test_missing_data_root_collects_nothing(tmp_path):
+    analysis = _generator(tmp_path)._analyze_actual_collection_status([{'ticker': 'AAPL', 'market_cap': 3e12}])
+
+    assert analysis['collection_stats'] == {} and analysis['collected_tickers'] == 0
+    assert analysis['failures']['AAPL']['category'] == 'COMPLETE_FAILURE'
+
+
+def test_concurrent_counts_keep_the_listing_order(tmp_path, monkeypatch):
+    generator = _generator(tmp_path)
+    polygon = Path(generator.base_path)
+    for i in range(120):
+        for day in range(1, i % 4 + 1):  # every fourth ticker has no files
+            _write(polygon / f'T{i:03d}' / '2025' / '06' / f'2025-06-{day:02d}.json')
+
+    threads = set()
+    real_count = failure_summary_generator.count_json_files
+
+    def counting_on(path):
+        threads.add(threading.current_thread().name)
+        return real_count(path)
+
+    monkeypatch.setattr(failure_summary_generator, 'count_json_files', counting_on)
+    analysis = generator._analyze_actual_collection_status([])
+
+    reference = _reference_stats(generator.base_path)
+    assert list(analysis['collection_stats'].items()) == list(reference.items())
+    assert len(reference) == 90
+    assert threading.current_thread().name not in threads  # counted on the pool, not inline
+
+
+def test_failures_are_categorized_against_the_market_cap_threshold(tmp_path):
+    input_data = [{'ticker': 'SMALL', 'market_cap': 1_500_000_000},
+                  {'ticker': 'EDGE', 'market_cap': failure_summary_generator.MARKET_CAP_THRESHOLD},
+                  {'ticker': 'NOCAP'}]
+    failures = _generator(tmp_path)._analyze_actual_collection_status(input_data)['failures']
+
+    assert failures['SMALL']['category'] == 'INSUFFICIENT_MARKET_CAP'
+    assert failures['SMALL']['reason'] == 'Market cap $1,500,000,000 below $2B threshold'
+    assert failures['EDGE']['category'] == 'COMPLETE_FAILURE'
+    assert failures['NOCAP']['category'] == 'INSUFFICIENT_MARKET_CAP'
+    assert failures['NOCAP']['ticker_info'] == {'ticker': 'NOCAP'} and failures['NOCAP']['market_cap'] == 0